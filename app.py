@@ -1,15 +1,42 @@
 
-from flask import Flask, request, redirect, render_template, session, url_for, send_file, Response, jsonify
+import time
+IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, request, redirect, render_template, session, url_for, send_file, Response, jsonify, g
+from flask import before_render_template, template_rendered, stream_with_context, make_response
 from urllib.parse import urlparse
-import string
-import random
 import re
-from supabase import create_client, Client
 import os
 from dotenv import load_dotenv
 import logging
 import io
+import json
+import base64
+import itertools
+import functools
+import csv
+import zlib
+import math
+from datetime import datetime, timedelta, timezone
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import ClosingIterator
+from link_cache import LinkCache, MISSING
+from click_analytics import ClickRecorder
+from code_allocator import BlockAllocator, RandomAllocator, TakenCodeFilter, DuplicateCodeError, is_unique_violation
+from repository import SupabaseRepository, SQLiteRepository, MemoryRepository
+from content_store import SupabaseContentStore, LocalContentStore, MemoryContentStore, LOCAL_STORAGE_PREFIX
+from query_fanout import QueryFanOut
+from link_search import normalize_query
+from supabase_client import LazySupabaseClient
+from upload_pipeline import SpooledUpload, UploadTooLarge
+from rate_limit import TokenBuckets, RedisTokenBuckets, RateLimiter, ConcurrencyLimiter, parse_budget
+import image_variants
+import text_offload
+from http_cache import AssetFingerprints, link_validators, is_not_modified, apply_validators, files_fingerprint
+from metrics import (
+    InstrumentedBackend, request_duration, template_render_duration, record_timing,
+    server_timing_header, render_metrics, render_gauges
+)
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 app.secret_key = os.getenv('SECRET_KEY') or os.getenv('FLASK_SECRET_KEY') or 'dev-secret-change-me'
@@ -17,80 +44,562 @@ app.secret_key = os.getenv('SECRET_KEY') or os.getenv('FLASK_SECRET_KEY') or 'de
 logging.basicConfig(level=logging.DEBUG)
 load_dotenv()
 
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_KEY = os.getenv('SUPABASE_KEY')
+# Backend data: 'supabase' (default), 'sqlite' (file SQLITE_PATH + folder LOCAL_STORAGE_DIR)
+# atau 'memory' (semua di memori proses, untuk benchmark dan profiling).
+DATA_BACKEND = os.getenv('DATA_BACKEND', 'supabase').lower()
+
+supabase = None
+if DATA_BACKEND == 'supabase':
+    SUPABASE_URL = os.getenv('SUPABASE_URL')
+    SUPABASE_KEY = os.getenv('SUPABASE_KEY')
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise ValueError("SUPABASE_URL dan SUPABASE_KEY harus diatur di file .env.")
+
+    # SDK supabase baru di-import dan client baru dibuat saat query pertama (lihat supabase_client.py)
+    supabase = LazySupabaseClient(
+        SUPABASE_URL,
+        SUPABASE_KEY,
+        max_connections=int(os.getenv('SUPABASE_POOL_SIZE', 20)),
+        max_keepalive=int(os.getenv('SUPABASE_POOL_KEEPALIVE', 10)),
+        keepalive_expiry=float(os.getenv('SUPABASE_KEEPALIVE_EXPIRY', 60))
+    )
+    repo = SupabaseRepository(supabase)
+    content_store = SupabaseContentStore(supabase)
+elif DATA_BACKEND == 'sqlite':
+    repo = SQLiteRepository(os.getenv('SQLITE_PATH', 'linkit.db'), int(os.getenv('SEARCH_INDEX_USERS', 64)))
+    content_store = LocalContentStore(os.getenv('LOCAL_STORAGE_DIR', 'local_storage'))
+elif DATA_BACKEND == 'memory':
+    repo = MemoryRepository(int(os.getenv('SEARCH_INDEX_USERS', 64)))
+    content_store = MemoryContentStore()
+else:
+    raise ValueError(f"DATA_BACKEND tidak dikenal: {DATA_BACKEND}")
+
+# Waktu cold start proses ini: import modul app dan request pertama (lihat /metrics)
+startup_stats = {'import_seconds': None, 'first_request_seconds': None, 'first_request_after_import_seconds': None}
+
+# Setiap panggilan database/storage diukur untuk Server-Timing dan /metrics
+repo = InstrumentedBackend(repo, 'db')
+content_store = InstrumentedBackend(content_store, 'storage')
+
+SERVER_TIMING = os.getenv('SERVER_TIMING', '1').lower() in ('1', 'true', 'yes')
+# Log request yang lebih lambat dari ambang ini (ms) beserta rinciannya; 0 = mati
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 0))
+# Bila diisi, /metrics mensyaratkan header Authorization: Bearer <token>
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Cache resolve short_code di memori proses. Setel LINK_CACHE_SIZE=0 untuk mematikan.
+# Tiap worker punya cache sendiri, jadi TTL membatasi seberapa lama worker lain bisa basi.
+link_cache = LinkCache(
+    max_entries=int(os.getenv('LINK_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('LINK_CACHE_TTL', 60)),
+    negative_max_entries=int(os.getenv('LINK_CACHE_NEGATIVE_SIZE', 4096)),
+    negative_ttl=float(os.getenv('LINK_CACHE_NEGATIVE_TTL', 30))
+)
+
+# Daftar folder per user (dropdown di index/dashboard) di-cache singkat; di-invalidasi saat
+# folder ditambah/dihapus. Worker lain bisa melihat data basi paling lama FOLDER_CACHE_TTL.
+folder_cache = LinkCache(
+    max_entries=int(os.getenv('FOLDER_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('FOLDER_CACHE_TTL', 30)),
+    negative_max_entries=0
+)
+
+# Query independen dalam satu request (halaman link, count, folder) dijalankan paralel.
+# QUERY_FANOUT_WORKERS=0 untuk kembali berurutan.
+query_fanout = QueryFanOut(int(os.getenv('QUERY_FANOUT_WORKERS', 8)))
+
+# Rate limit token bucket per IP dan per user, dengan anggaran '<jumlah>/<detik>' per aksi
+# (default '0' = tanpa batas). Dicek sebelum query apa pun; RATE_LIMIT_REDIS_URL membagi
+# bucket antar worker, tanpanya tiap worker punya bucket sendiri. Di belakang proxy (Vercel,
+# router Heroku) RATE_LIMIT_PROXY_HOPS wajib diisi, kalau tidak semua klien berbagi satu bucket.
+RATE_LIMIT_BUDGETS = {
+    'create': parse_budget(os.getenv('RATE_LIMIT_CREATE', '0')),
+    'resolve': parse_budget(os.getenv('RATE_LIMIT_RESOLVE', '0')),
+    'download': parse_budget(os.getenv('RATE_LIMIT_DOWNLOAD', '0')),
+    'login': parse_budget(os.getenv('RATE_LIMIT_LOGIN', '0'))
+}
+RATE_LIMIT_ENDPOINTS = {
+    'shorten': 'create',
+    'shorten_batch': 'create',
+    'redirect_url': 'resolve',
+    'download': 'download',
+    'image_variant': 'download',
+    'login': 'login',
+    'register': 'login'
+}
+# Jumlah proxy tepercaya di depan app (Vercel/Heroku = 1); IP klien diambil dari X-Forwarded-For
+RATE_LIMIT_PROXY_HOPS = int(os.getenv('RATE_LIMIT_PROXY_HOPS', 0))
+if any(RATE_LIMIT_BUDGETS.values()) and not RATE_LIMIT_PROXY_HOPS:
+    logging.warning("Rate limit aktif dengan RATE_LIMIT_PROXY_HOPS=0: bucket memakai IP koneksi langsung. "
+                    "Di belakang proxy isi RATE_LIMIT_PROXY_HOPS agar klien tidak berbagi satu bucket.")
+rate_limit_buckets = TokenBuckets(max_keys=int(os.getenv('RATE_LIMIT_MAX_KEYS', 10000)))
+if os.getenv('RATE_LIMIT_REDIS_URL'):
+    rate_limit_buckets = RedisTokenBuckets(os.getenv('RATE_LIMIT_REDIS_URL'), rate_limit_buckets)
+rate_limiter = RateLimiter(RATE_LIMIT_BUDGETS, rate_limit_buckets)
+# Load shedding: maksimum request create/download yang berjalan bersamaan per proses (0 = mati)
+heavy_requests = ConcurrencyLimiter(int(os.getenv('RATE_LIMIT_MAX_INFLIGHT', 0)))
+
+# Mode untuk link URL: 'redirect' (302), 'permanent' (301, bisa di-cache browser/CDN)
+# atau 'interstitial' (halaman content.html). Tambahkan ?preview untuk selalu melihat halaman.
+REDIRECT_MODE = os.getenv('REDIRECT_MODE', 'redirect').lower()
+REDIRECT_CACHE_MAX_AGE = int(os.getenv('REDIRECT_CACHE_MAX_AGE', 3600))
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("SUPABASE_URL dan SUPABASE_KEY harus diatur di file .env.")
+FILE_MIMETYPES = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+}
 
-try:
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-except Exception as e:
-    raise ValueError(f"Gagal menginisialisasi Supabase: {str(e)}")
+# Download file: 'stream' mem-proxy byte per chunk, 'signed' redirect ke signed URL
+# berumur pendek sehingga app tidak ikut mengalirkan byte sama sekali.
+DOWNLOAD_MODE = os.getenv('DOWNLOAD_MODE', 'stream').lower()
+SIGNED_URL_TTL = int(os.getenv('SIGNED_URL_TTL', 60))
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PASSTHROUGH_REQUEST_HEADERS = ('Range', 'If-Range', 'If-None-Match', 'If-Modified-Since')
+# Upload: ditahan di memori sampai UPLOAD_SPOOL_THRESHOLD byte, selebihnya di file sementara
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv('UPLOAD_SPOOL_THRESHOLD', 1024 * 1024))
+# Varian gambar (thumbnail + WebP) dibuat saat pertama diminta lalu disimpan di samping
+# objek asli. Butuh Pillow; tanpa Pillow halaman konten memakai gambar asli.
+IMAGE_VARIANT_WIDTHS = tuple(int(width) for width in os.getenv('IMAGE_VARIANT_WIDTHS', '320,640,1280').split(',') if width.strip())
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Teks di atas TEXT_OFFLOAD_THRESHOLD byte disimpan terkompresi (zstd bila terpasang, selain
+# itu gzip) di storage; baris link hanya berisi preview TEXT_PREVIEW_CHARS karakter + ukuran.
+TEXT_OFFLOAD_THRESHOLD = int(os.getenv('TEXT_OFFLOAD_THRESHOLD', 16 * 1024))
+TEXT_PREVIEW_CHARS = int(os.getenv('TEXT_PREVIEW_CHARS', 280))
 
-def generate_short_code(length=6):
-    characters = string.ascii_letters + string.digits
-    return ''.join(random.choice(characters) for _ in range(length))
+# Cache-Control per tipe konten untuk halaman /<short_code> dan /download. Halaman untuk user
+# yang login selalu 'private, no-cache' (browser tetap revalidasi murah lewat ETag -> 304).
+# Catatan: respons yang dilayani cache/CDN tidak sampai ke app, jadi tidak tercatat sebagai klik.
+CACHE_POLICIES = {
+    'url': os.getenv('CACHE_POLICY_URL', 'public, max-age=60'),
+    'text': os.getenv('CACHE_POLICY_TEXT', 'public, max-age=60'),
+    'image': os.getenv('CACHE_POLICY_IMAGE', 'public, max-age=300'),
+    'document': os.getenv('CACHE_POLICY_DOCUMENT', 'public, max-age=300')
+}
+PRIVATE_CACHE_CONTROL = 'private, no-cache'
+# Versi halaman konten ikut dalam ETag agar deploy template/partial/script baru tidak tertahan
+# 304 lama (halaman lama menunjuk ?v= script lama yang di-cache immutable)
+CONTENT_PAGE_TEMPLATES = ('content.html', 'header.html', 'footer.html')
+CONTENT_PAGE_ASSETS = ('js/scripts.js',)
+CONTENT_TEMPLATE_VERSION, CONTENT_TEMPLATE_MTIME = files_fingerprint(
+    [os.path.join(app.root_path, 'templates', name) for name in CONTENT_PAGE_TEMPLATES]
+    + [os.path.join(app.root_path, app.static_folder, name) for name in CONTENT_PAGE_ASSETS]
+)
+CONTENT_PAGE_VERSION = f"{CONTENT_TEMPLATE_VERSION}|{image_variants.available()}|{IMAGE_VARIANT_WIDTHS}"
+
+# File statis di-fingerprint (?v=<hash isi>) dan boleh di-cache selamanya selama versinya cocok
+asset_fingerprints = AssetFingerprints(app.static_folder)
+# Batas jumlah kode per query in_() (panjang URL) dan path per panggilan remove storage
+BULK_QUERY_BATCH = 500
+STORAGE_REMOVE_BATCH = 1000
+PASSTHROUGH_RESPONSE_HEADERS = ('Content-Length', 'Content-Range', 'Accept-Ranges', 'ETag', 'Last-Modified', 'Cache-Control')
+
+# Batas item per request /api/shorten/batch; item diproses per BULK_QUERY_BATCH
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 10000))
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl', 'application/ndjson')
+
+# Export: baris per query cursor; memori konstan berapa pun jumlah link
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))
+EXPORT_FIELDS = ('short_code', 'short_url', 'content_type', 'content', 'folder_id', 'folder_name', 'click_count', 'created_at')
+
+# Kolom yang ditampilkan tabel dashboard (+ created_at untuk cursor pagination)
+LINK_LIST_COLUMNS = 'short_code, content_type, content, folder_id, created_at, click_count, content_hash, content_size'
+# Metode hitung PostgREST untuk total link: 'exact', 'planned' atau 'estimated'
+DASHBOARD_COUNT_MODE = os.getenv('DASHBOARD_COUNT_MODE', 'exact').lower()
+LINKS_PER_PAGE = 10
+# Pencarian (?q=) di short code, host/path URL, preview teks dan nama file
+SEARCH_MIN_CHARS = 2
+
+# Alokasi short code: 'block' menyewa blok ID dari RPC lease_code_block (lihat README),
+# 'random' memakai kode acak. Keduanya mengandalkan unique constraint saat insert.
+CODE_ALLOCATOR = os.getenv('CODE_ALLOCATOR', 'block').lower()
+CODE_BLOCK_SIZE = int(os.getenv('CODE_BLOCK_SIZE', 100))
+# Kunci permutasi ID -> kode; tanpa kunci rahasia kode 'block' bisa dihitung dari counter
+CODE_SCRAMBLE_KEY = os.getenv('CODE_SCRAMBLE_KEY') or app.secret_key
+CODE_INSERT_ATTEMPTS = 5
+
+if CODE_ALLOCATOR == 'random':
+    code_allocator = RandomAllocator()
+else:
+    if CODE_SCRAMBLE_KEY == 'dev-secret-change-me':
+        logging.warning("CODE_SCRAMBLE_KEY/SECRET_KEY belum diisi: short code bisa ditebak, set salah satunya di production")
+    code_allocator = BlockAllocator(repo.lease_code_block, CODE_SCRAMBLE_KEY, block_size=CODE_BLOCK_SIZE)
+
+# Bloom filter kode terpakai untuk pre-check kode kustom tanpa round trip (opsional)
+taken_codes = None
+if os.getenv('CODE_BLOOM_FILTER', '').lower() in ('1', 'true', 'yes'):
+    taken_codes = TakenCodeFilter(capacity=int(os.getenv('CODE_BLOOM_CAPACITY', 1_000_000)))
+    taken_codes.warm(repo.list_codes_after)
+
+@functools.lru_cache(maxsize=1)
+def reserved_codes():
+    # Kode yang sama dengan route statis (mis. /metrics, /login) tidak akan pernah ter-resolve
+    return frozenset(rule.rule.strip('/').split('/')[0].lower() for rule in app.url_map.iter_rules() if not rule.arguments)
+
+def is_reserved_code(code):
+    return code.lower() in reserved_codes()
 
 def is_valid_custom_code(code):
-    return bool(re.match(r'^[a-zA-Z0-9_-]{3,10}$', code))
+    return bool(re.match(r'^[a-zA-Z0-9_-]{3,10}$', code)) and not is_reserved_code(code)
 
 def code_exists(short_code):
     try:
-        response = supabase.table('links').select('short_code').eq('short_code', short_code).execute()
-        return len(response.data) > 0
+        return repo.code_exists(short_code)
     except Exception as e:
         logging.error(f"Error saat cek kode: {str(e)}")
         return False
 
+def get_link(short_code):
+    link = link_cache.get(short_code)
+    if link is not MISSING:
+        return link
+    link = repo.get_link(short_code)
+    if not link:
+        link_cache.set_missing(short_code)
+        return None
+    link_cache.set(short_code, link)
+    return link
+
+# Statistik klik: dicatat ke buffer in-process dan ditulis per batch lewat RPC
+# record_link_clicks (lihat README), jadi redirect tidak menunggu UPDATE.
+CLICK_ANALYTICS = os.getenv('CLICK_ANALYTICS', '1').lower() in ('1', 'true', 'yes')
+click_recorder = ClickRecorder(
+    repo.record_clicks,
+    buffer_size=int(os.getenv('CLICK_BUFFER_SIZE', 10000)),
+    flush_size=int(os.getenv('CLICK_FLUSH_SIZE', 500)),
+    flush_interval=float(os.getenv('CLICK_FLUSH_INTERVAL', 10))
+)
+if CLICK_ANALYTICS:
+    click_recorder.start()
+
+def custom_code_taken(short_code):
+    if taken_codes is not None and not taken_codes.maybe_taken(short_code):
+        return False
+    return code_exists(short_code)
+
 def email_exists(email, exclude_user_id=None):
     try:
-        query = supabase.table('users').select('email').eq('email', email)
-        if exclude_user_id:
-            query = query.neq('id', exclude_user_id)
-        response = query.execute()
-        return len(response.data) > 0
+        return repo.email_exists(email, exclude_user_id)
     except Exception as e:
         logging.error(f"Error saat cek email: {str(e)}")
         return False
 
+def get_folders(user_id):
+    folders = folder_cache.get(user_id)
+    if folders is MISSING:
+        folders = repo.list_folders(user_id)
+        folder_cache.set(user_id, folders)
+    return folders
+
+def render_index(**context):
+    # Dropdown "Simpan ke Folder" di index.html selalu butuh daftar folder
+    user = session.get('user')
+    folders = get_folders(user['id']) if user else []
+    return render_template('index.html', user=user, folders=folders, **context)
+
 def folder_name_exists(name, user_id):
     try:
-        response = supabase.table('folders').select('name').eq('name', name).eq('user_id', user_id).execute()
-        return len(response.data) > 0
+        return repo.folder_name_exists(name, user_id)
     except Exception as e:
         logging.error(f"Error saat cek nama folder: {str(e)}")
         return False
 
-def store_link(short_code, content_type, content, user_id, folder_id=None):
+def store_link(short_code, content_type, content, user_id, folder_id=None, file_info=None):
     try:
-        supabase.table('links').insert({
+        row = {
             'short_code': short_code,
             'content_type': content_type,
             'content': content,
             'user_id': user_id,
             'folder_id': folder_id
-        }).execute()
+        }
+        # file_info: {'file_name': ..., 'content_hash': ...} untuk link gambar/dokumen,
+        # {'content_hash': ..., 'content_size': ...} untuk teks besar (lihat offload_text)
+        row.update(file_info or {})
+        repo.insert_link(row)
+        link_cache.invalidate(short_code)
+        if taken_codes is not None:
+            taken_codes.add(short_code)
         logging.debug(f"Stored link: short_code={short_code}, folder_id={folder_id}")
     except Exception as e:
+        if is_unique_violation(e):
+            raise DuplicateCodeError(short_code) from e
         logging.error(f"Error saat menyimpan link: {str(e)}")
         raise
 
-def delete_link(short_code, user_id):
+def store_generated_link(short_code, content_type, content, user_id, folder_id=None, file_info=None):
+    # Kode hasil allocator hampir tidak pernah bentrok (hanya dengan kode lama/kustom),
+    # jadi cukup ambil kode berikutnya dan ulangi insert.
+    for _ in range(CODE_INSERT_ATTEMPTS - 1):
+        try:
+            store_link(short_code, content_type, content, user_id, folder_id, file_info)
+            return short_code
+        except DuplicateCodeError:
+            logging.debug(f"Short code bentrok, alokasi ulang: {short_code}")
+            short_code = code_allocator.allocate()
+    store_link(short_code, content_type, content, user_id, folder_id, file_info)
+    return short_code
+
+def store_upload(upload, file_ext):
+    # File disimpan per hash isi di objects/<2 huruf>/<sha256>.<ext>. File yang sama persis
+    # cukup menambah ref_count lewat satu lookup, tanpa upload ulang.
+    content_hash = upload.hexdigest
+    path = repo.acquire_content(content_hash)
+    if path:
+        logging.debug(f"Upload dedup: {content_hash} -> {path}")
+        return path, content_hash
+    mimetype = FILE_MIMETYPES.get(file_ext, 'application/octet-stream')
+    path = f"objects/{content_hash[:2]}/{content_hash}.{file_ext}"
     try:
-        response = supabase.table('links').select('*').eq('short_code', short_code).eq('user_id', user_id).execute()
-        if not response.data:
-            return False
-        link = response.data[0]
-        if link['content_type'] in ('image', 'document'):
-            file_name = link['content'].split('/content/')[-1]
-            supabase.storage.from_('content').remove([file_name])
-        supabase.table('links').delete().eq('short_code', short_code).eq('user_id', user_id).execute()
-        logging.debug(f"Deleted link: short_code={short_code}, user_id={user_id}")
-        return True
+        with upload.payload() as data:
+            content_store.upload(path, data, mimetype)
+    except FileExistsError:
+        # Objek sudah ada (upload paralel file yang sama); cukup catat referensinya
+        pass
+    return repo.register_content(content_hash, path, upload.size, mimetype), content_hash
+
+def release_uploads(content_hashes):
+    # Lepas referensi; objek dihapus dari storage hanya bila link terakhirnya sudah hilang
+    paths = repo.release_content(content_hashes)
+    removed = paths + [variant for path in paths for variant in image_variants.variant_paths(path, IMAGE_VARIANT_WIDTHS)]
+    for start in range(0, len(removed), STORAGE_REMOVE_BATCH):
+        content_store.remove(removed[start:start + STORAGE_REMOVE_BATCH])
+    return paths
+
+def offload_text(text):
+    # None bila teks cukup kecil untuk disimpan langsung di baris link. Teks besar disimpan
+    # per hash seperti file upload, jadi teks yang sama persis cukup menambah ref_count.
+    data = text.encode('utf-8')
+    if not TEXT_OFFLOAD_THRESHOLD or len(data) <= TEXT_OFFLOAD_THRESHOLD:
+        return None
+    codec = text_offload.preferred_codec()
+    content_hash = text_offload.content_key(data, codec)
+    if not repo.acquire_content(content_hash):
+        path = text_offload.object_path(content_hash)
+        compressed = text_offload.compress(data, codec)
+        try:
+            content_store.upload(path, compressed, text_offload.MIMETYPES[codec])
+        except FileExistsError:
+            pass
+        repo.register_content(content_hash, path, len(compressed), text_offload.MIMETYPES[codec])
+    return {
+        'content': text_offload.preview(text, TEXT_PREVIEW_CHARS),
+        'content_hash': content_hash,
+        'content_size': len(data)
+    }
+
+def is_offloaded_text(link):
+    return link['content_type'] == 'text' and bool(link.get('content_hash'))
+
+def iter_offloaded_text(link):
+    # Byte UTF-8 teks asli, didekompresi per chunk langsung dari storage
+    upstream = content_store.open(text_offload.object_path(link['content_hash']))
+    if upstream.status_code >= 400:
+        upstream.read()
+        upstream.close()
+        raise Exception(f"Storage mengembalikan status {upstream.status_code}")
+
+    def generate():
+        try:
+            yield from text_offload.decompress_chunks(upstream.iter_bytes(DOWNLOAD_CHUNK_SIZE), text_offload.codec_of(link['content_hash']))
+        finally:
+            upstream.close()
+
+    return generate()
+
+def asset_url(filename):
+    return url_for('static', filename=filename, v=asset_fingerprints.version(filename))
+
+app.jinja_env.globals['asset_url'] = asset_url
+
+def content_validators(link, user=None, variant='page'):
+    # (etag, last_modified, cache_control) dari baris link, tanpa perlu render
+    user_key = f"{user['id']}|{user.get('email')}" if user else ''
+    # Versi aset dibaca ulang per request (murah, di-cache per mtime) agar tetap benar tanpa restart
+    assets = '|'.join(asset_fingerprints.version(name) or '' for name in CONTENT_PAGE_ASSETS) if variant == 'page' else ''
+    etag, last_modified = link_validators(link, variant, CONTENT_PAGE_VERSION, assets, user_key)
+    if variant == 'page' and last_modified:
+        last_modified = max(last_modified, CONTENT_TEMPLATE_MTIME)
+    cache_control = PRIVATE_CACHE_CONTROL if user else CACHE_POLICIES.get(link['content_type'], PRIVATE_CACHE_CONTROL)
+    return etag, last_modified, cache_control
+
+def image_sources(link):
+    # srcset varian untuk gambar yang disimpan per hash (path-nya tidak pernah berubah isi);
+    # None berarti halaman memakai gambar asli
+    if not image_variants.available() or not IMAGE_VARIANT_WIDTHS or not link.get('content_hash'):
+        return None
+    file_path = link['content'].split('/content/')[-1]
+    if file_path.rsplit('.', 1)[-1].lower() not in image_variants.IMAGE_EXTENSIONS:
+        return None
+
+    def srcset(fmt):
+        return ', '.join(f"{url_for('image_variant', width=width, fmt=fmt, file_path=file_path)} {width}w" for width in IMAGE_VARIANT_WIDTHS)
+
+    return {
+        'webp_srcset': srcset('webp'),
+        'srcset': srcset('orig'),
+        'src': url_for('image_variant', width=IMAGE_VARIANT_WIDTHS[len(IMAGE_VARIANT_WIDTHS) // 2], fmt='orig', file_path=file_path),
+        'sizes': '(max-width: 640px) 100vw, 640px'
+    }
+
+def prepare_batch_item(item, default_folder_id, folder_ids):
+    # Validasi satu item batch; kembalikan (row tanpa short_code, custom_code) atau ValueError
+    if not isinstance(item, dict):
+        raise ValueError('Item harus berupa objek JSON')
+    content_type = item.get('content_type', 'url')
+    if content_type == 'url':
+        content = str(item.get('url') or '').strip()
+        if content and not content.startswith(('http://', 'https://')):
+            content = 'http://' + content
+        if content and not urlparse(content).netloc:
+            raise ValueError('URL tidak valid!')
+    elif content_type == 'text':
+        content = str(item.get('text') or '')
+    else:
+        raise ValueError('content_type harus url atau text')
+    if not content:
+        raise ValueError('Konten tidak valid! Pastikan URL atau teks diisi.')
+
+    custom_code = str(item.get('custom_code') or '').strip()
+    if custom_code and not is_valid_custom_code(custom_code):
+        raise ValueError('Kode kustom tidak valid! Gunakan 3-10 karakter (huruf, angka, _, -).')
+
+    folder_id = item.get('folder_id', default_folder_id)
+    if folder_id in (None, '', 'null'):
+        folder_id = None
+    elif str(folder_id) not in folder_ids:
+        raise ValueError('Folder tidak ditemukan atau tidak diizinkan')
+    else:
+        folder_id = int(folder_id) if str(folder_id).isdigit() else folder_id
+    return {'content_type': content_type, 'content': content, 'folder_id': folder_id}, custom_code
+
+def store_batch_rows(rows):
+    # Satu insert multi-row; bila ada yang bentrok, ulangi per baris agar hasilnya per item.
+    # Kembalikan {index: short_code atau pesan error (DuplicateCodeError/Exception)}.
+    try:
+        repo.insert_links([row for _, row, _ in rows])
+        stored = {index: row['short_code'] for index, row, _ in rows}
+    except DuplicateCodeError:
+        logging.debug(f"Batch insert bentrok, ulangi per baris: {len(rows)} baris")
+        stored = {}
+        for index, row, is_custom in rows:
+            try:
+                file_info = {'content_hash': row['content_hash'], 'content_size': row['content_size']}
+                if is_custom:
+                    store_link(row['short_code'], row['content_type'], row['content'], row['user_id'], row['folder_id'], file_info)
+                    stored[index] = row['short_code']
+                else:
+                    stored[index] = store_generated_link(row['short_code'], row['content_type'], row['content'], row['user_id'], row['folder_id'], file_info)
+            except DuplicateCodeError:
+                stored[index] = DuplicateCodeError('Kode kustom sudah digunakan!')
+            except Exception as e:
+                stored[index] = e
+        return stored
+    codes = list(stored.values())
+    link_cache.invalidate(*codes)
+    if taken_codes is not None:
+        for short_code in codes:
+            taken_codes.add(short_code)
+    return stored
+
+def shorten_batch_chunk(chunk, user_id, default_folder_id, folder_ids, seen_custom_codes):
+    # chunk: list (index, item). Satu lookup in_() untuk kode kustom, satu alokasi kode
+    # massal dan satu insert multi-row; hasil dikembalikan per item sesuai urutan.
+    results = {}
+    prepared = []
+    for index, item in chunk:
+        try:
+            row, custom_code = prepare_batch_item(item, default_folder_id, folder_ids)
+        except (ValueError, TypeError) as e:
+            results[index] = {'index': index, 'success': False, 'error': str(e)}
+            continue
+        if custom_code:
+            if custom_code in seen_custom_codes:
+                results[index] = {'index': index, 'success': False, 'error': 'Kode kustom duplikat dalam batch!'}
+                continue
+            seen_custom_codes.add(custom_code)
+        prepared.append((index, row, custom_code))
+
+    rows = []
+    try:
+        custom_codes = [code for _, _, code in prepared if code]
+        if taken_codes is not None:
+            custom_codes = [code for code in custom_codes if taken_codes.maybe_taken(code)]
+        taken = repo.existing_codes(custom_codes)
+        generated = iter(code_allocator.allocate_many(sum(1 for _, _, code in prepared if not code)))
+        for index, row, custom_code in prepared:
+            if custom_code in taken:
+                results[index] = {'index': index, 'success': False, 'error': 'Kode kustom sudah digunakan!'}
+                continue
+            try:
+                offloaded = offload_text(row['content']) if row['content_type'] == 'text' else None
+            except Exception as e:
+                logging.error(f"Error saat menyimpan teks ke storage: {str(e)}")
+                results[index] = {'index': index, 'success': False, 'error': f'Gagal menyimpan teks: {str(e)}'}
+                continue
+            # Semua baris insert multi-row harus punya kolom yang sama
+            row.update(offloaded or {'content_hash': None, 'content_size': None})
+            row.update(short_code=custom_code or next(generated), user_id=user_id)
+            rows.append((index, row, bool(custom_code)))
+        stored = store_batch_rows(rows) if rows else {}
     except Exception as e:
-        logging.error(f"Error saat hapus link: {str(e)}")
-        return False
+        logging.error(f"Error saat menyimpan batch link: {str(e)}")
+        stored = {index: e for index, _, _ in prepared if index not in results}
+
+    orphaned = [row['content_hash'] for index, row, _ in rows if row['content_hash'] and isinstance(stored.get(index), Exception)]
+    if orphaned:
+        try:
+            release_uploads(orphaned)
+        except Exception as e:
+            logging.error(f"Gagal membersihkan teks batch: {str(e)}")
+
+    for index, outcome in stored.items():
+        if isinstance(outcome, Exception):
+            results[index] = {'index': index, 'success': False, 'error': str(outcome)}
+        else:
+            results[index] = {'index': index, 'success': True, 'short_code': outcome}
+    return [results[index] for index in sorted(results)]
+
+def delete_links(short_codes, user_id):
+    # Hapus banyak link sekaligus: satu select in_(), satu remove storage per batch, satu delete.
+    # Kembalikan status per kode: 'deleted', 'not_found' atau 'error'.
+    short_codes = list(dict.fromkeys(short_codes))
+    results = {short_code: 'not_found' for short_code in short_codes}
+    for start in range(0, len(short_codes), BULK_QUERY_BATCH):
+        batch = short_codes[start:start + BULK_QUERY_BATCH]
+        try:
+            links = repo.get_user_links(user_id, batch, 'short_code, content_type, content, content_hash')
+            found_codes = [link['short_code'] for link in links]
+            if not found_codes:
+                continue
+            file_links = [link for link in links if link['content_type'] in ('image', 'document')]
+            # File lama (sebelum dedup) milik satu link saja, jadi langsung dihapus
+            file_names = [link['content'].split('/content/')[-1] for link in file_links if not link.get('content_hash')]
+            for file_start in range(0, len(file_names), STORAGE_REMOVE_BATCH):
+                content_store.remove(file_names[file_start:file_start + STORAGE_REMOVE_BATCH])
+            repo.delete_user_links(user_id, found_codes)
+        except Exception as e:
+            logging.error(f"Error saat hapus link: {str(e)}")
+            results.update({short_code: 'error' for short_code in batch})
+            continue
+        link_cache.invalidate(*found_codes)
+        results.update({short_code: 'deleted' for short_code in found_codes})
+        logging.debug(f"Deleted links: short_codes={found_codes}, user_id={user_id}")
+        # Objek per hash (file upload dan teks besar) dilepas lewat ref_count. Link sudah terhapus,
+        # jadi kegagalan di sini hanya meninggalkan objek yatim di storage.
+        try:
+            release_uploads([link['content_hash'] for link in links if link.get('content_hash')])
+        except Exception as e:
+            logging.error(f"Error saat melepas file link yang dihapus: {str(e)}")
+    return results
+
+def delete_link(short_code, user_id):
+    return delete_links([short_code], user_id).get(short_code) == 'deleted'
 
 def update_short_code(old_code, new_code, user_id):
     try:
@@ -98,20 +607,238 @@ def update_short_code(old_code, new_code, user_id):
             return False, "Kode kustom sudah digunakan!"
         if not is_valid_custom_code(new_code):
             return False, "Kode kustom tidak valid! Gunakan 3-10 karakter (huruf, angka, _, -)."
-        supabase.table('links').update({'short_code': new_code}).eq('short_code', old_code).eq('user_id', user_id).execute()
+        repo.rename_link(user_id, old_code, new_code)
+        link_cache.invalidate(old_code, new_code)
+        if taken_codes is not None:
+            taken_codes.add(new_code)
         logging.debug(f"Updated short_code: {old_code} to {new_code}, user_id={user_id}")
         return True, None
     except Exception as e:
         logging.error(f"Error saat update short_code: {str(e)}")
         return False, str(e)
 
+def download_filename(file_path):
+    if '_' in file_path:
+        original_filename = file_path.split('_', 1)[1]
+    else:
+        original_filename = file_path
+    if '.' in original_filename:
+        name_part, ext = original_filename.rsplit('.', 1)
+        name_part = name_part.rstrip('_')
+        original_filename = f"{name_part}.{ext}"
+    else:
+        original_filename = original_filename.rstrip('_')
+    return secure_filename(original_filename)
+
+def stream_storage_object(file_path, original_filename, as_attachment=True):
+    # Proxy objek storage per chunk; Range/If-None-Match diteruskan ke content store
+    # sehingga 206/304 dan ETag datang langsung dari sana tanpa memuat file ke memori.
+    upstream_headers = {name: request.headers[name] for name in PASSTHROUGH_REQUEST_HEADERS if name in request.headers}
+    upstream = content_store.open(file_path, upstream_headers)
+    if upstream.status_code >= 400:
+        upstream.read()
+        upstream.close()
+        if upstream.status_code >= 500:
+            raise Exception(f"Storage mengembalikan status {upstream.status_code}")
+        # 4xx diteruskan apa adanya (mis. 416 + Content-Range: bytes */N untuk Range di luar
+        # ukuran file) agar klien yang melanjutkan download tidak dialihkan ke dashboard
+        headers = {name: upstream.headers[name] for name in ('Content-Range', 'Accept-Ranges') if name in upstream.headers}
+        return Response(status=upstream.status_code, headers=headers)
+
+    headers = {name: upstream.headers[name] for name in PASSTHROUGH_RESPONSE_HEADERS if name in upstream.headers}
+    if upstream.status_code == 304:
+        upstream.close()
+        return Response(status=304, headers=headers)
+
+    file_ext = original_filename.rsplit('.', 1)[-1].lower() if '.' in original_filename else ''
+    if as_attachment:
+        headers['Content-Disposition'] = f'attachment; filename="{original_filename}"'
+    headers.setdefault('Accept-Ranges', 'bytes')
+
+    def generate():
+        try:
+            for chunk in upstream.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+        finally:
+            upstream.close()
+
+    return Response(
+        generate(),
+        status=upstream.status_code,
+        mimetype=FILE_MIMETYPES.get(file_ext, 'application/octet-stream'),
+        headers=headers,
+        direct_passthrough=True
+    )
+
+def encode_cursor(link):
+    raw = json.dumps([link['created_at'], link['short_code']]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+CURSOR_CODE_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, short_code = json.loads(raw)
+        created_at, short_code = str(created_at), str(short_code)
+        # Nilai cursor masuk ke filter or_() PostgREST, jadi hanya timestamp ISO dan kode polos
+        datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+    except Exception:
+        return None
+    if not CURSOR_CODE_PATTERN.match(short_code):
+        return None
+    return created_at, short_code
+
+def count_links(user_id, folder_id=None, content_type=None, search=None):
+    return repo.count_links(user_id, folder_id, content_type, count=DASHBOARD_COUNT_MODE, search=search)
+
+def search_query():
+    # Kata kunci ?q= yang sudah dinormalisasi; None bila kosong, ValueError bila terlalu pendek
+    query = normalize_query(request.args.get('q'))
+    if not query:
+        return None
+    if len(query) < SEARCH_MIN_CHARS:
+        raise ValueError(f'Kata kunci minimal {SEARCH_MIN_CHARS} karakter')
+    return query
+
+def fetch_links_page(user_id, folder_id=None, content_type=None, cursor=None, page=1, per_page=LINKS_PER_PAGE, with_count=False, search=None):
+    # Keyset pagination di (created_at, short_code) bila ada cursor, selain itu offset biasa.
+    # Kembalikan (links, next_cursor, total); total None kecuali with_count pada mode offset.
+    count = DASHBOARD_COUNT_MODE if with_count and not cursor else None
+    links, total = repo.list_links(
+        user_id, folder_id, content_type,
+        cursor=cursor,
+        offset=(page - 1) * per_page,
+        limit=per_page,
+        columns=LINK_LIST_COLUMNS,
+        count=count,
+        search=search
+    )
+    next_cursor = encode_cursor(links[-1]) if len(links) == per_page else None
+    return links, next_cursor, total if count else None
+
+proxy_warning_logged = False
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.timings = []
+
+def client_ip():
+    global proxy_warning_logged
+    if not RATE_LIMIT_PROXY_HOPS and not proxy_warning_logged and 'X-Forwarded-For' in request.headers:
+        proxy_warning_logged = True
+        logging.warning("Request membawa X-Forwarded-For tetapi RATE_LIMIT_PROXY_HOPS=0; "
+                        "rate limit memakai alamat proxy untuk semua klien.")
+    if RATE_LIMIT_PROXY_HOPS:
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if len(forwarded) >= RATE_LIMIT_PROXY_HOPS:
+            return forwarded[-RATE_LIMIT_PROXY_HOPS]
+    return request.remote_addr or 'unknown'
+
+def too_many_requests(retry_after, status=429):
+    retry_after = max(int(math.ceil(retry_after)), 1)
+    message = f'Terlalu banyak permintaan. Coba lagi dalam {retry_after} detik.'
+    if request.path.startswith('/api/'):
+        response = jsonify({'success': False, 'error': message})
+    else:
+        response = Response(message + '\n', mimetype='text/plain')
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def rate_limit_identities(budget):
+    identities = [f"ip:{client_ip()}"]
+    # Membaca session menambah Vary: Cookie, yang membuat redirect/download publik tidak
+    # bisa di-cache CDN. Resolve cukup per IP; lainnya hanya bila cookie session ada.
+    if budget != 'resolve' and app.config['SESSION_COOKIE_NAME'] in request.cookies:
+        user = session.get('user')
+        if user:
+            identities.append(f"user:{user['id']}")
+    return identities
+
+@app.before_request
+def enforce_rate_limit():
+    # Ditolak sebelum query database/storage
+    budget = RATE_LIMIT_ENDPOINTS.get(request.endpoint)
+    if budget is None or (budget == 'login' and request.method != 'POST'):
+        return None
+    if rate_limiter.enabled(budget):
+        retry_after = rate_limiter.check(budget, rate_limit_identities(budget))
+        if retry_after:
+            return too_many_requests(retry_after)
+    if budget in ('create', 'download'):
+        if not heavy_requests.acquire():
+            return too_many_requests(1, status=503)
+        g.heavy_request = True
+    return None
+
+@app.after_request
+def release_heavy_request_on_close(response):
+    # Slot dilepas setelah body selesai dikirim (download di-stream setelah view selesai).
+    # Respons direct_passthrough tidak menjalankan call_on_close, jadi iterable-nya dibungkus.
+    if g.pop('heavy_request', False):
+        if response.direct_passthrough:
+            response.response = ClosingIterator(response.response, heavy_requests.release)
+        else:
+            response.call_on_close(heavy_requests.release)
+    return response
+
+@app.teardown_request
+def release_heavy_request(exc):
+    # Request gagal sebelum after_request berjalan
+    if g.pop('heavy_request', False):
+        heavy_requests.release()
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def stop_template_timer(sender, template, context, **extra):
+    started = g.pop('template_started', None)
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        template_render_duration.observe((template.name,), elapsed)
+        record_timing('tpl', template.name, elapsed)
+
+@app.after_request
+def record_request_timing(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    request_duration.observe((route, request.method, str(response.status_code)), elapsed)
+    if startup_stats['first_request_seconds'] is None:
+        startup_stats['first_request_seconds'] = elapsed
+        startup_stats['first_request_after_import_seconds'] = time.perf_counter() - IMPORT_STARTED
+        logging.info(f"Request pertama {request.method} {request.path}: {elapsed * 1000:.1f}ms")
+    timings = g.get('timings', [])
+    if SERVER_TIMING:
+        response.headers['Server-Timing'] = server_timing_header(timings, elapsed)
+    if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+        breakdown = ', '.join(f"{kind}:{name}={seconds * 1000:.1f}ms" for kind, name, seconds in timings)
+        logging.warning(f"Request lambat: {request.method} {request.path} {elapsed * 1000:.1f}ms [{breakdown}]")
+    return response
+
+@app.after_request
+def static_cache_headers(response):
+    # /static/...?v=<hash> yang cocok dengan isi file saat ini -> immutable; selain itu revalidasi
+    if request.endpoint == 'static' and response.status_code in (200, 206, 304):
+        version = request.args.get('v')
+        if version and version == asset_fingerprints.version(request.view_args.get('filename', '')):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers['Cache-Control'] = 'public, no-cache'
+    return response
+
 @app.route('/')
 def index():
-    user = session.get('user')
-    folders = []
-    if user:
-        folders = supabase.table('folders').select('*').eq('user_id', user['id']).execute().data
-    return render_template('index.html', user=user, folders=folders)
+    return render_index()
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
@@ -121,11 +848,7 @@ def register():
         if email_exists(email):
             return render_template('register.html', error='Email sudah digunakan!')
         try:
-            response = supabase.table('users').insert({
-                'email': email,
-                'password': password
-            }).execute()
-            user_id = response.data[0]['id']
+            user_id = repo.create_user(email, password)['id']
             session['user'] = {'email': email, 'id': user_id}
             return redirect(url_for('index'))
         except Exception as e:
@@ -138,9 +861,9 @@ def login():
     if request.method == 'POST':
         email = request.form['email']
         password = request.form['password']
-        response = supabase.table('users').select('*').eq('email', email).eq('password', password).execute()
-        if response.data:
-            session['user'] = {'email': email, 'id': response.data[0]['id']}
+        found_user = repo.find_user(email, password)
+        if found_user:
+            session['user'] = {'email': email, 'id': found_user['id']}
             return redirect(url_for('index'))
         return render_template('login.html', error='Email atau password salah!')
     return render_template('login.html')
@@ -156,22 +879,30 @@ def dashboard():
         return redirect(url_for('login'))
 
     user_id = session['user']['id']
-    page = int(request.args.get('page', 1))
+    page = max(request.args.get('page', 1, type=int), 1)
     folder_id = request.args.get('folder_id')
+    folder_id = int(folder_id) if folder_id and folder_id.isdigit() else None
     content_type = request.args.get('content_type')
-    per_page = 10
-
-    query = supabase.table('links').select('*').eq('user_id', user_id)
-    if folder_id and folder_id.isdigit():
-        query = query.eq('folder_id', int(folder_id))
-    if content_type:
-        query = query.eq('content_type', content_type)
-
-    total_links = len(query.execute().data)
-    total_pages = (total_links + per_page - 1) // per_page
+    cursor = decode_cursor(request.args.get('cursor'))
+    try:
+        search = search_query()
+    except ValueError:
+        # Kata kunci terlalu pendek diperlakukan seperti tanpa pencarian
+        search = None
 
-    links = query.order('created_at', desc=True).range((page - 1) * per_page, page * per_page - 1).execute().data
-    folders = supabase.table('folders').select('*').eq('user_id', user_id).execute().data
+    # Halaman link, total dan folder tidak saling bergantung, jadi diambil paralel
+    if cursor:
+        (links, next_cursor, _), total_links, folders = query_fanout.run(
+            lambda: fetch_links_page(user_id, folder_id, content_type, cursor=cursor, search=search),
+            lambda: count_links(user_id, folder_id, content_type, search),
+            lambda: get_folders(user_id)
+        )
+    else:
+        (links, next_cursor, total_links), folders = query_fanout.run(
+            lambda: fetch_links_page(user_id, folder_id, content_type, page=page, with_count=True, search=search),
+            lambda: get_folders(user_id)
+        )
+    total_pages = (total_links + LINKS_PER_PAGE - 1) // LINKS_PER_PAGE
 
     return render_template(
         'dashboard.html',
@@ -179,10 +910,151 @@ def dashboard():
         links=links,
         page=page,
         total_pages=total_pages,
+        next_cursor=next_cursor,
         folders=folders,
-        selected_folder=int(folder_id) if folder_id and folder_id.isdigit() else None
+        selected_folder=folder_id,
+        search=search or '',
+        search_min_chars=SEARCH_MIN_CHARS
+    )
+
+@app.route('/api/links')
+def api_links():
+    if 'user' not in session:
+        return jsonify({'success': False, 'error': 'Tidak diizinkan'}), 401
+
+    user_id = session['user']['id']
+    folder_id = request.args.get('folder_id')
+    folder_id = int(folder_id) if folder_id and folder_id.isdigit() else None
+    content_type = request.args.get('content_type')
+    limit = min(max(request.args.get('limit', LINKS_PER_PAGE, type=int), 1), 100)
+    cursor = decode_cursor(request.args.get('cursor'))
+    if request.args.get('cursor') and not cursor:
+        return jsonify({'success': False, 'error': 'Cursor tidak valid'}), 400
+    try:
+        search = search_query()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    render_html = request.args.get('render') == 'html'
+    try:
+        fetch_page = lambda: fetch_links_page(user_id, folder_id, content_type, cursor=cursor, per_page=limit, search=search)
+        if render_html:
+            (links, next_cursor, _), folders = query_fanout.run(fetch_page, lambda: get_folders(user_id))
+        else:
+            links, next_cursor, _ = fetch_page()
+    except Exception as e:
+        logging.error(f"Error saat mengambil daftar link: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    result = {'success': True, 'links': links, 'next_cursor': next_cursor}
+    if render_html:
+        result['html'] = render_template('link_rows.html', links=links, folders=folders)
+    return jsonify(result)
+
+def export_content(link):
+    # Teks besar diekspor utuh dari storage, bukan preview di baris link
+    if not is_offloaded_text(link):
+        return link.get('content')
+    return b''.join(iter_offloaded_text(link)).decode('utf-8')
+
+def iter_export_rows(user_id, folder_id, content_type, base_url, folder_names, search=None):
+    cursor = None
+    while True:
+        links, next_cursor, _ = fetch_links_page(user_id, folder_id, content_type, cursor=cursor, per_page=EXPORT_CHUNK_SIZE, search=search)
+        yield [
+            dict(
+                {field: link.get(field) for field in EXPORT_FIELDS},
+                content=export_content(link),
+                short_url=base_url + link['short_code'],
+                folder_name=folder_names.get(str(link.get('folder_id')), ''),
+                click_count=link.get('click_count') or 0
+            )
+            for link in links
+        ]
+        if not next_cursor:
+            break
+        cursor = decode_cursor(next_cursor)
+
+def encode_export_chunk(rows, export_format, with_header):
+    if export_format == 'ndjson':
+        return ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    if with_header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+@app.route('/export')
+def export_links():
+    # ?format=csv|ndjson&gzip=1 dengan filter folder_id/content_type/q seperti dashboard.
+    # Tabel links ditelusuri per EXPORT_CHUNK_SIZE baris lewat cursor dan langsung di-stream.
+    if 'user' not in session:
+        return redirect(url_for('login'))
+
+    user_id = session['user']['id']
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'error': 'Format harus csv atau ndjson'}), 400
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    folder_id = request.args.get('folder_id')
+    folder_id = int(folder_id) if folder_id and folder_id.isdigit() else None
+    content_type = request.args.get('content_type') or None
+    try:
+        search = search_query()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    folder_names = {str(folder['id']): folder['name'] for folder in get_folders(user_id)}
+    base_url = f"http://{urlparse(request.base_url).netloc}/"
+
+    def generate():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        first = True
+        for rows in iter_export_rows(user_id, folder_id, content_type, base_url, folder_names, search):
+            data = encode_export_chunk(rows, export_format, with_header=first).encode('utf-8')
+            first = False
+            if compressor:
+                # Sync flush agar klien menerima data per chunk, bukan setelah export selesai
+                data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        if compressor:
+            yield compressor.flush()
+
+    filename = f"linkit-export-{datetime.now(timezone.utc):%Y%m%d}.{export_format}{'.gz' if compress else ''}"
+    mimetype = 'application/gzip' if compress else ('text/csv' if export_format == 'csv' else 'application/x-ndjson')
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"', 'Cache-Control': 'no-store'}
     )
 
+@app.route('/api/links/<short_code>/clicks')
+def link_clicks(short_code):
+    if 'user' not in session:
+        return jsonify({'success': False, 'error': 'Tidak diizinkan'}), 401
+
+    user_id = session['user']['id']
+    days = min(max(request.args.get('days', 7, type=int), 1), 90)
+    bucket = 'hour' if days == 1 else 'day'
+    try:
+        links = repo.get_user_links(user_id, [short_code], 'short_code, click_count')
+        if not links:
+            return jsonify({'success': False, 'error': 'Link tidak ditemukan'}), 404
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+        series = repo.click_series(short_code, since, bucket)
+    except Exception as e:
+        logging.error(f"Error saat mengambil statistik klik: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    return jsonify({
+        'success': True,
+        'short_code': short_code,
+        'total': links[0].get('click_count') or 0,
+        'bucket': bucket,
+        'series': series
+    })
+
 @app.route('/add_folder', methods=['POST'])
 def add_folder():
     if 'user' not in session:
@@ -197,10 +1069,8 @@ def add_folder():
         return redirect(url_for('dashboard', error='Nama folder sudah digunakan!'))
 
     try:
-        supabase.table('folders').insert({
-            'name': folder_name,
-            'user_id': user_id
-        }).execute()
+        repo.create_folder(folder_name, user_id)
+        folder_cache.invalidate(user_id)
         return redirect(url_for('dashboard', success='Folder berhasil ditambahkan!'))
     except Exception as e:
         logging.error(f"Gagal menambahkan folder: {str(e)}")
@@ -214,12 +1084,12 @@ def delete_folder(folder_id):
     user_id = session['user']['id']
     try:
         # Verify folder belongs to user
-        response = supabase.table('folders').select('id').eq('id', folder_id).eq('user_id', user_id).execute()
-        if not response.data:
+        if not repo.owned_folder_ids(user_id, [folder_id]):
             return redirect(url_for('dashboard', error='Folder tidak ditemukan atau tidak diizinkan!'))
         
         # Delete folder (links will have folder_id set to NULL due to on delete set null)
-        supabase.table('folders').delete().eq('id', folder_id).eq('user_id', user_id).execute()
+        repo.delete_folders(user_id, [folder_id])
+        folder_cache.invalidate(user_id)
         logging.debug(f"Deleted folder: folder_id={folder_id}, user_id={user_id}")
         return redirect(url_for('dashboard', success='Folder berhasil dihapus!'))
     except Exception as e:
@@ -236,14 +1106,14 @@ def delete_selected_folders():
         return redirect(url_for('dashboard', error='Tidak ada folder yang dipilih!'))
     try:
         # Verify all folders belong to user
-        response = supabase.table('folders').select('id').eq('user_id', user_id).in_('id', selected_folders).execute()
-        valid_folder_ids = {str(row['id']) for row in response.data}
+        valid_folder_ids = repo.owned_folder_ids(user_id, selected_folders)
         invalid_folder_ids = [fid for fid in selected_folders if fid not in valid_folder_ids]
         if invalid_folder_ids:
             return redirect(url_for('dashboard', error=f'Folder tidak ditemukan atau tidak diizinkan: {", ".join(invalid_folder_ids)}'))
         
         # Delete selected folders
-        supabase.table('folders').delete().eq('user_id', user_id).in_('id', selected_folders).execute()
+        repo.delete_folders(user_id, selected_folders)
+        folder_cache.invalidate(user_id)
         logging.debug(f"Deleted folders: folder_ids={selected_folders}, user_id={user_id}")
         return redirect(url_for('dashboard', success='Folder terpilih berhasil dihapus!'))
     except Exception as e:
@@ -268,7 +1138,7 @@ def profile():
         if not updates:
             return render_template('profile.html', user=user, error='Tidak ada perubahan yang dilakukan!')
         try:
-            supabase.table('users').update(updates).eq('id', user['id']).execute()
+            repo.update_user(user['id'], updates)
             session['user']['email'] = new_email if new_email else user['email']
             return render_template('profile.html', user=session['user'], success='Profil berhasil diperbarui!')
         except Exception as e:
@@ -289,23 +1159,29 @@ def shorten():
     
     if custom_code:
         if not is_valid_custom_code(custom_code):
-            return render_template('index.html', user=session['user'], error='Kode kustom tidak valid! Gunakan 3-10 karakter (huruf, angka, _, -).')
-        if code_exists(custom_code):
-            return render_template('index.html', user=session['user'], error='Kode kustom sudah digunakan! Coba kode lain.')
+            return render_index(error='Kode kustom tidak valid! Gunakan 3-10 karakter (huruf, angka, _, -).')
+        # Cek awal agar upload file tidak sia-sia; insert tetap dijaga unique constraint
+        if custom_code_taken(custom_code):
+            return render_index(error='Kode kustom sudah digunakan! Coba kode lain.')
         short_code = custom_code
     else:
-        while True:
-            short_code = generate_short_code()
-            if not code_exists(short_code):
-                break
+        short_code = code_allocator.allocate()
 
     content = ''
+    file_info = None
     if content_type == 'url':
         content = request.form.get('url', '')
         if not content.startswith(('http://', 'https://')):
             content = 'http://' + content
     elif content_type == 'text':
         content = request.form.get('text', '')
+        try:
+            file_info = offload_text(content)
+        except Exception as e:
+            logging.error(f"Error saat menyimpan teks ke storage: {str(e)}")
+            return render_index(error=f'Gagal menyimpan teks: {str(e)}')
+        if file_info:
+            content = file_info.pop('content')
     elif content_type in ('image', 'document'):
         file = request.files.get('file')
         if file:
@@ -315,117 +1191,263 @@ def shorten():
             }
             file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
             if content_type == 'image' and file_ext not in allowed_extensions['image']:
-                return render_template('index.html', user=session['user'], error=f'File tidak valid! Gunakan {", ".join(allowed_extensions["image"])} untuk gambar.')
+                return render_index(error=f'File tidak valid! Gunakan {", ".join(allowed_extensions["image"])} untuk gambar.')
             if content_type == 'document' and file_ext not in allowed_extensions['document']:
-                return render_template('index.html', user=session['user'], error=f'File tidak valid! Gunakan {", ".join(allowed_extensions["document"])} untuk dokumen.')
-            
-            file.seek(0, os.SEEK_END)
-            file_size = file.tell()
-            file.seek(0)
-            if file_size > 10 * 1024 * 1024:
-                return render_template('index.html', user=session['user'], error='File terlalu besar! Maksimum 10MB.')
-            
-            file_name = f"{user_id}/{short_code}_{file.filename.replace(' ', '_')}"
-            content_type_map = {
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-                'png': 'image/png',
-                'pdf': 'application/pdf',
-                'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            }
-            try:
-                file_content = file.read()
-                supabase.storage.from_('content').upload(
-                    file_name,
-                    file_content,
-                    {'content-type': content_type_map.get(file_ext, 'application/octet-stream')}
-                )
-                content = supabase.storage.from_('content').get_public_url(file_name)
-            except Exception as e:
-                logging.error(f"Error saat upload file: {str(e)}")
-                return render_template('index.html', user=session['user'], error=f'Gagal mengunggah file: {str(e)}')
+                return render_index(error=f'File tidak valid! Gunakan {", ".join(allowed_extensions["document"])} untuk dokumen.')
+
+            # Dibaca per chunk ke spool (memori lalu disk) sambil di-hash; tidak pernah utuh di memori
+            with SpooledUpload(UPLOAD_SPOOL_THRESHOLD, MAX_UPLOAD_SIZE, DOWNLOAD_CHUNK_SIZE) as upload:
+                try:
+                    upload.consume(file.stream)
+                except UploadTooLarge:
+                    return render_index(error='File terlalu besar! Maksimum 10MB.')
+                try:
+                    file_path, content_hash = store_upload(upload, file_ext)
+                    content = content_store.public_url(file_path)
+                except Exception as e:
+                    logging.error(f"Error saat upload file: {str(e)}")
+                    return render_index(error=f'Gagal mengunggah file: {str(e)}')
+            file_info = {'file_name': secure_filename(file.filename) or f'file.{file_ext}', 'content_hash': content_hash}
         else:
-            return render_template('index.html', user=session['user'], error='Harap unggah file!')
+            return render_index(error='Harap unggah file!')
 
     if not content:
-        return render_template('index.html', user=session['user'], error='Konten tidak valid! Pastikan URL, teks, atau file diisi.')
+        return render_index(error='Konten tidak valid! Pastikan URL, teks, atau file diisi.')
 
     try:
-        store_link(short_code, content_type, content, user_id, folder_id)
+        if custom_code:
+            store_link(short_code, content_type, content, user_id, folder_id, file_info)
+        else:
+            short_code = store_generated_link(short_code, content_type, content, user_id, folder_id, file_info)
     except Exception as e:
-        return render_template('index.html', user=session['user'], error=f'Gagal menyimpan link: {str(e)}')
+        if file_info:
+            try:
+                release_uploads([file_info['content_hash']])
+            except Exception as cleanup_error:
+                logging.error(f"Gagal membersihkan file upload: {str(cleanup_error)}")
+        if isinstance(e, DuplicateCodeError):
+            return render_index(error='Kode kustom sudah digunakan! Coba kode lain.')
+        return render_index(error=f'Gagal menyimpan link: {str(e)}')
 
     domain = urlparse(request.base_url).netloc
     short_url = f"http://{domain}/{short_code}"
-    return render_template('index.html', user=session['user'], short_url=short_url, success=f'Berhasil memendekkan! Link Anda: {short_url}')
+    return render_index(short_url=short_url, success=f'Berhasil memendekkan! Link Anda: {short_url}')
+
+@app.route('/api/shorten/batch', methods=['POST'])
+def shorten_batch():
+    # Body JSON (list item atau {"links": [...], "folder_id": ...}) atau NDJSON (satu item per baris).
+    # Item: {"url": ...} atau {"content_type": "text", "text": ...}, opsional custom_code dan folder_id.
+    # Hasil di-stream sebagai NDJSON per item setelah chunk-nya tersimpan, diakhiri baris ringkasan.
+    if 'user' not in session:
+        return jsonify({'success': False, 'error': 'Tidak diizinkan'}), 401
+
+    user_id = session['user']['id']
+    default_folder_id = request.args.get('folder_id')
+    if request.mimetype in NDJSON_MIMETYPES:
+        def read_ndjson():
+            for line in request.stream:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+        items = read_ndjson()
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            default_folder_id = data.get('folder_id', default_folder_id)
+            data = data.get('links')
+        if not isinstance(data, list):
+            return jsonify({'success': False, 'error': 'Body harus berupa list link atau {"links": [...]}'}), 400
+        if len(data) > BATCH_MAX_ITEMS:
+            return jsonify({'success': False, 'error': f'Maksimum {BATCH_MAX_ITEMS} link per batch'}), 400
+        items = iter(data)
+
+    folder_ids = {str(folder['id']) for folder in get_folders(user_id)}
+    base_url = f"http://{urlparse(request.base_url).netloc}/"
+    # Anggaran create ditagih per item: token request (enforce_rate_limit) menutup item pertama,
+    # sisanya ditagih per chunk sebelum chunk diproses. Chunk tidak lebih besar dari burst agar
+    # tagihannya selalu bisa terpenuhi.
+    chunk_size = BULK_QUERY_BATCH
+    identities = None
+    if rate_limiter.enabled('create'):
+        identities = rate_limit_identities('create')
+        chunk_size = max(1, min(chunk_size, int(rate_limiter.budgets['create'][0])))
+
+    def generate():
+        numbered = enumerate(items)
+        seen_custom_codes = set()
+        created = failed = 0
+        while True:
+            chunk = list(itertools.islice(numbered, chunk_size))
+            if not chunk:
+                break
+            overflow = chunk[-1][0] - BATCH_MAX_ITEMS + 1
+            if overflow > 0:
+                chunk = chunk[:len(chunk) - overflow]
+            if identities is not None and chunk:
+                cost = len(chunk) - (1 if chunk[0][0] == 0 else 0)
+                retry_after = rate_limiter.check('create', identities, cost) if cost else 0
+                if retry_after:
+                    yield json.dumps({
+                        'success': False,
+                        'error': f'Terlalu banyak permintaan, item mulai index {chunk[0][0]} tidak diproses',
+                        'retry_after': math.ceil(retry_after)
+                    }) + '\n'
+                    break
+            for result in shorten_batch_chunk(chunk, user_id, default_folder_id, folder_ids, seen_custom_codes):
+                if result['success']:
+                    created += 1
+                    result['short_url'] = base_url + result['short_code']
+                else:
+                    failed += 1
+                yield json.dumps(result) + '\n'
+            if overflow > 0:
+                yield json.dumps({'success': False, 'error': f'Maksimum {BATCH_MAX_ITEMS} link per batch, sisa item diabaikan'}) + '\n'
+                break
+        yield json.dumps({'done': True, 'created': created, 'failed': failed}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/<short_code>')
 def redirect_url(short_code):
-    response = supabase.table('links').select('*').eq('short_code', short_code).execute()
-    if not response.data:
+    link = get_link(short_code)
+    if not link:
         return render_template('404.html'), 404
 
-    link = response.data[0]
+    if CLICK_ANALYTICS:
+        click_recorder.record(short_code, request.referrer, request.user_agent.string)
     content_type = link['content_type']
     content = link['content']
+    if content_type == 'url' and REDIRECT_MODE != 'interstitial' and 'preview' not in request.args:
+        if REDIRECT_MODE == 'permanent':
+            response = redirect(content, code=301)
+            response.headers['Cache-Control'] = f'public, max-age={REDIRECT_CACHE_MAX_AGE}'
+            return response
+        return redirect(content, code=302)
     user = session.get('user')
-    return render_template('content.html', content_type=content_type, content=content, short_code=short_code, user=user)
+    etag, last_modified, cache_control = content_validators(link, user)
+    if is_not_modified(request, etag, last_modified):
+        return apply_validators(Response(status=304), etag, last_modified, cache_control)
+    image = image_sources(link) if content_type == 'image' else None
+    # Teks besar: halaman hanya memuat preview, teks lengkap diambil browser dari /download
+    text_size = link.get('content_size') if is_offloaded_text(link) else None
+    response = make_response(render_template('content.html', content_type=content_type, content=content, short_code=short_code, user=user, image=image, text_size=text_size))
+    return apply_validators(response, etag, last_modified, cache_control)
 
 @app.route('/download/<short_code>')
 def download(short_code):
-    response = supabase.table('links').select('*').eq('short_code', short_code).execute()
-    if not response.data:
+    link = get_link(short_code)
+    if not link:
         return render_template('404.html'), 404
 
-    link = response.data[0]
     content_type = link['content_type']
     content = link['content']
 
     if content_type == 'url':
         return redirect(url_for('dashboard', error='Konten URL tidak dapat diunduh!'))
 
+    # Isi download tidak bergantung pada user, jadi validator dan kebijakan cache-nya publik
+    etag, last_modified, cache_control = content_validators(link, variant='download')
     try:
         if content_type == 'text':
-            file_data = content.encode('utf-8')
+            if is_not_modified(request, etag, last_modified):
+                return apply_validators(Response(status=304), etag, last_modified, cache_control)
             original_filename = secure_filename(f"{short_code}.txt")
-            return Response(
+            if is_offloaded_text(link):
+                headers = {'Content-Disposition': f'attachment; filename="{original_filename}"'}
+                if link.get('content_size'):
+                    headers['Content-Length'] = str(link['content_size'])
+                response = Response(iter_offloaded_text(link), mimetype='text/plain', headers=headers, direct_passthrough=True)
+                return apply_validators(response, etag, last_modified, cache_control)
+            file_data = content.encode('utf-8')
+            response = Response(
                 file_data,
                 mimetype='text/plain',
                 headers={'Content-Disposition': f'attachment; filename="{original_filename}"'}
             )
+            apply_validators(response, etag, last_modified, cache_control)
+            return response.make_conditional(request, accept_ranges=True, complete_length=len(file_data))
         elif content_type in ('image', 'document'):
             file_path = content.split('/content/')[-1]
-            file_data = supabase.storage.from_('content').download(file_path)
-            if '_' in file_path:
-                original_filename = file_path.split('_', 1)[1]
-            else:
-                original_filename = file_path
-            if '.' in original_filename:
-                name_part, ext = original_filename.rsplit('.', 1)
-                name_part = name_part.rstrip('_')
-                original_filename = f"{name_part}.{ext}"
-            else:
-                original_filename = original_filename.rstrip('_')
-            original_filename = secure_filename(original_filename)
-            file_ext = original_filename.rsplit('.', 1)[-1].lower() if '.' in original_filename else ''
-            content_type_map = {
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-                'png': 'image/png',
-                'pdf': 'application/pdf',
-                'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            }
-            return Response(
-                file_data,
-                mimetype=content_type_map.get(file_ext, 'application/octet-stream'),
-                headers={'Content-Disposition': f'attachment; filename="{original_filename}"'}
-            )
+            original_filename = secure_filename(link.get('file_name') or '') or download_filename(file_path)
+            if DOWNLOAD_MODE == 'signed':
+                return redirect(content_store.signed_url(file_path, SIGNED_URL_TTL, original_filename), code=302)
+            response = stream_storage_object(file_path, original_filename)
+            if response.status_code == 404:
+                return render_template('404.html'), 404
+            if response.status_code < 400:
+                response.headers['Cache-Control'] = cache_control
+            return response
         else:
             return redirect(url_for('dashboard', error='Konten tidak dapat diunduh!'))
     except Exception as e:
         logging.error(f"Error saat download file: {str(e)}")
         return redirect(url_for('dashboard', error=f'Gagal mengunduh file: {str(e)}'))
 
+@app.route('/img/<int:width>/<fmt>/<path:file_path>')
+def image_variant(width, fmt, file_path):
+    # Varian disajikan dari storage bila sudah ada; bila belum, dibuat dari objek asli,
+    # disimpan untuk request berikutnya, lalu dikirim dengan cache immutable (path berbasis hash).
+    file_ext = file_path.rsplit('.', 1)[-1].lower() if '.' in file_path else ''
+    if (width not in IMAGE_VARIANT_WIDTHS or fmt not in image_variants.VARIANT_FORMATS
+            or not file_path.startswith('objects/') or file_ext not in image_variants.IMAGE_EXTENSIONS):
+        return render_template('404.html'), 404
+    if not image_variants.available():
+        return redirect(content_store.public_url(file_path))
+
+    target = image_variants.variant_path(file_path, width, fmt)
+    try:
+        response = stream_storage_object(target, target.rsplit('/', 1)[-1], as_attachment=False)
+        # Selain 416, status 4xx berarti varian belum ada (Supabase bisa menjawab 400/404)
+        if response.status_code < 400 or response.status_code == 416:
+            if response.status_code < 400:
+                response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+            return response
+    except Exception:
+        pass
+    logging.debug(f"Varian gambar belum ada, dibuat: {target}")
+
+    try:
+        original = content_store.open(file_path)
+        try:
+            if original.status_code != 200:
+                return render_template('404.html'), 404
+            data = original.read()
+        finally:
+            original.close()
+        variant = image_variants.render_variant(data, width, fmt, file_ext)
+    except Exception as e:
+        logging.error(f"Error saat membuat varian gambar: {str(e)}")
+        return redirect(content_store.public_url(file_path))
+
+    mimetype = FILE_MIMETYPES.get(target.rsplit('.', 1)[-1], 'application/octet-stream')
+    try:
+        content_store.upload(target, variant, mimetype)
+    except FileExistsError:
+        pass
+    except Exception as e:
+        logging.error(f"Gagal menyimpan varian gambar: {str(e)}")
+    response = Response(variant, mimetype=mimetype, headers={'Cache-Control': IMMUTABLE_CACHE_CONTROL})
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route(LOCAL_STORAGE_PREFIX + '<path:file_path>')
+def local_storage(file_path):
+    # Hanya aktif untuk backend lokal; di Supabase file dilayani langsung oleh Storage
+    if not getattr(content_store, 'serves_locally', False):
+        return render_template('404.html'), 404
+    try:
+        response = stream_storage_object(file_path, download_filename(file_path), as_attachment=False)
+        if response.status_code == 404:
+            return render_template('404.html'), 404
+        return response
+    except Exception as e:
+        logging.debug(f"File lokal tidak ditemukan: {file_path} ({str(e)})")
+        return render_template('404.html'), 404
+
 @app.route('/delete/<short_code>', methods=['POST'])
 def delete(short_code):
     if 'user' not in session:
@@ -461,16 +1483,15 @@ def move_to_folder():
 
     try:
         # Verifikasi bahwa semua link milik pengguna
-        response = supabase.table('links').select('short_code').eq('user_id', user_id).in_('short_code', short_codes).execute()
-        valid_short_codes = {row['short_code'] for row in response.data}
+        valid_short_codes = {row['short_code'] for row in repo.get_user_links(user_id, short_codes, 'short_code')}
         invalid_short_codes = [sc for sc in short_codes if sc not in valid_short_codes]
 
         if invalid_short_codes:
             return jsonify({'success': False, 'error': f'Link tidak ditemukan atau tidak diizinkan: {", ".join(invalid_short_codes)}'}), 404
 
         # Perbarui folder_id untuk semua link yang valid
-        update_data = {'folder_id': None if folder_id == 'null' else folder_id}
-        supabase.table('links').update(update_data).eq('user_id', user_id).in_('short_code', short_codes).execute()
+        repo.move_links(user_id, short_codes, None if folder_id == 'null' else folder_id)
+        link_cache.invalidate(*short_codes)
         
         logging.debug(f"Memindahkan link: short_codes={short_codes}, folder_id={folder_id}, user_id={user_id}")
         return jsonify({'success': True})
@@ -483,16 +1504,50 @@ def delete_selected():
     if 'user' not in session:
         return redirect(url_for('login'))
     user_id = session['user']['id']
-    selected_links = request.form.getlist('selected_links')
+    if request.is_json:
+        selected_links = (request.get_json() or {}).get('short_codes', [])
+    else:
+        selected_links = request.form.getlist('selected_links')
     if not selected_links:
+        if request.is_json:
+            return jsonify({'success': False, 'error': 'Tidak ada link yang dipilih'}), 400
         return redirect(url_for('dashboard', error='Tidak ada link yang dipilih!'))
     try:
-        for short_code in selected_links:
-            delete_link(short_code, user_id)
+        results = delete_links(selected_links, user_id)
+        link_cache.invalidate(*selected_links)
+        failed = [short_code for short_code, status in results.items() if status != 'deleted']
+        if request.is_json:
+            return jsonify({'success': not failed, 'results': results})
+        if failed:
+            return redirect(url_for('dashboard', error=f'Gagal menghapus link: {", ".join(failed)}'))
         return redirect(url_for('dashboard', success='Link terpilih berhasil dihapus!'))
     except Exception as e:
         logging.error(f"Bulk delete error: {str(e)}")
         return redirect(url_for('dashboard', error='Terjadi kesalahan saat menghapus link!'))
 
+@app.route('/metrics')
+def metrics():
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    extra = render_gauges('linkit_link_cache', link_cache.stats(), 'Statistik cache resolve short code.')
+    extra += render_gauges('linkit_folder_cache', folder_cache.stats(), 'Statistik cache daftar folder per user.')
+    startup = dict(startup_stats, supabase_client_seconds=supabase.created_seconds if supabase else None)
+    extra += render_gauges('linkit_startup', startup, 'Waktu cold start proses (detik).')
+    extra += render_gauges('linkit_clicks', click_recorder.stats(), 'Statistik buffer klik.')
+    extra += render_gauges('linkit_rate_limit', dict(rate_limiter.stats(), **heavy_requests.stats()), 'Statistik rate limit dan load shedding.')
+    search_index = getattr(repo, 'search_index', None)
+    if search_index is not None:
+        extra += render_gauges('linkit_search_index', search_index.stats(), 'Indeks pencarian in-process (backend lokal).')
+    return Response(render_metrics(extra), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    if 'user' not in session:
+        return jsonify({'success': False, 'error': 'Tidak diizinkan'}), 401
+    return jsonify({'success': True, 'link_cache': link_cache.stats()})
+
+startup_stats['import_seconds'] = time.perf_counter() - IMPORT_STARTED
+logging.info(f"Import app selesai dalam {startup_stats['import_seconds'] * 1000:.1f}ms")
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
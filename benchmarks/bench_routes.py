@@ -0,0 +1,173 @@
+# Benchmark route utama lewat Flask test client dengan backend lokal (tanpa Supabase).
+#
+#   python benchmarks/bench_routes.py --backend memory --requests 500 --links 5000
+#
+# Melaporkan throughput dan latensi p50/p95/p99 per route.
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark route LinkIt dengan backend lokal.')
+    parser.add_argument('--backend', choices=('memory', 'sqlite'), default='memory')
+    parser.add_argument('--sqlite-path', default=os.path.join(ROOT, 'bench.db'))
+    parser.add_argument('--requests', type=int, default=300, help='jumlah request terukur per route')
+    parser.add_argument('--warmup', type=int, default=20, help='request pemanasan per route (tidak diukur)')
+    parser.add_argument('--links', type=int, default=2000, help='jumlah link awal milik user benchmark')
+    parser.add_argument('--bulk-size', type=int, default=50, help='jumlah link per request bulk')
+    parser.add_argument('--file-size', type=int, default=512 * 1024, help='ukuran file untuk /download (byte)')
+    parser.add_argument('--only', nargs='*', help='jalankan route tertentu saja')
+    parser.add_argument('--json', action='store_true', help='cetak hasil sebagai JSON')
+    return parser.parse_args()
+
+
+def load_app(args):
+    os.environ['DATA_BACKEND'] = args.backend
+    # Semua request datang dari satu IP/user, jadi rate limit dimatikan kecuali diatur lewat ENV
+    for name in ('RATE_LIMIT_CREATE', 'RATE_LIMIT_RESOLVE', 'RATE_LIMIT_DOWNLOAD', 'RATE_LIMIT_LOGIN'):
+        os.environ.setdefault(name, '0')
+    if args.backend == 'sqlite':
+        if os.path.exists(args.sqlite_path):
+            os.remove(args.sqlite_path)
+        os.environ['SQLITE_PATH'] = args.sqlite_path
+        os.environ.setdefault('LOCAL_STORAGE_DIR', os.path.join(ROOT, 'bench_storage'))
+    import app as linkit
+    logging.getLogger().setLevel(logging.WARNING)
+    return linkit
+
+
+def seed(linkit, client, args):
+    client.post('/register', data={'email': 'bench@example.com', 'password': 'bench'})
+    user_id = linkit.repo.find_user('bench@example.com', 'bench')['id']
+    codes = []
+    for i in range(args.links):
+        code = linkit.code_allocator.allocate()
+        linkit.repo.insert_link({
+            'short_code': code,
+            'content_type': 'url' if i % 4 else 'text',
+            'content': f'https://example.com/page/{i}' if i % 4 else f'Catatan benchmark {i}',
+            'user_id': user_id,
+            'folder_id': None
+        })
+        codes.append(code)
+    linkit.repo.create_folder('Bench', user_id)
+    folder_id = linkit.repo.list_folders(user_id)[0]['id']
+
+    response = client.post('/shorten', data={
+        'content_type': 'document',
+        'custom_code': 'benchdoc',
+        'file': (io.BytesIO(os.urandom(args.file_size)), 'bench.pdf')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200 and linkit.repo.get_link('benchdoc'), 'Gagal menyiapkan file benchmark'
+    return user_id, codes, folder_id
+
+
+def build_scenarios(linkit, client, args, user_id, codes, folder_id):
+    cursor = client.get('/api/links').get_json()['next_cursor']
+
+    def fresh_codes(count):
+        created = []
+        for _ in range(count):
+            code = linkit.code_allocator.allocate()
+            linkit.repo.insert_link({
+                'short_code': code,
+                'content_type': 'url',
+                'content': 'https://example.com/bulk',
+                'user_id': user_id,
+                'folder_id': None
+            })
+            created.append(code)
+        return created
+
+    # (nama, setup tanpa diukur -> payload, request terukur, status yang diharapkan)
+    return [
+        ('POST /shorten', None,
+         lambda _: client.post('/shorten', data={'content_type': 'url', 'url': 'https://example.com/new'}), 200),
+        ('POST /api/shorten/batch', lambda i: [{'url': f'https://example.com/batch/{i}/{j}'} for j in range(args.bulk_size)],
+         lambda batch: client.post('/api/shorten/batch', json=batch), 200),
+        ('GET /<short_code>', lambda _: random.choice(codes),
+         lambda code: client.get(f'/{code}'), (200, 301, 302)),
+        ('GET /<short_code> (404)', lambda i: f'zz{i:06d}',
+         lambda code: client.get(f'/{code}'), 404),
+        ('GET /dashboard', None,
+         lambda _: client.get('/dashboard'), 200),
+        ('GET /dashboard?page=N', lambda _: random.randint(1, max(args.links // 10, 1)),
+         lambda page: client.get(f'/dashboard?page={page}'), 200),
+        ('GET /api/links (cursor)', None,
+         lambda _: client.get(f'/api/links?cursor={cursor}'), 200),
+        ('GET /api/links?q= (search)', lambda _: f'page/{random.randint(1, args.links)}',
+         lambda term: client.get(f'/api/links?q={term}'), 200),
+        ('GET /download/<short_code>', None,
+         lambda _: client.get('/download/benchdoc'), 200),
+        ('POST /move_to_folder', lambda _: random.sample(codes, min(args.bulk_size, len(codes))),
+         lambda batch: client.post('/move_to_folder', json={'short_codes': batch, 'folder_id': folder_id}), 200),
+        ('POST /delete_selected', lambda _: fresh_codes(args.bulk_size),
+         lambda batch: client.post('/delete_selected', json={'short_codes': batch}), 200),
+    ]
+
+
+def run_scenario(name, setup, run, expected, args):
+    expected = expected if isinstance(expected, tuple) else (expected,)
+    for i in range(args.warmup):
+        response = run(setup(i) if setup else None)
+        response.get_data()
+    samples = []
+    for i in range(args.requests):
+        payload = setup(i) if setup else None
+        start = time.perf_counter()
+        response = run(payload)
+        response.get_data()
+        samples.append((time.perf_counter() - start) * 1000)
+        if response.status_code not in expected:
+            raise RuntimeError(f'{name}: status {response.status_code}, diharapkan {expected}')
+    total_seconds = sum(samples) / 1000
+    return {
+        'route': name,
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / total_seconds, 1) if total_seconds else 0.0,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3)
+    }
+
+
+def main():
+    args = parse_args()
+    linkit = load_app(args)
+    client = linkit.app.test_client()
+    user_id, codes, folder_id = seed(linkit, client, args)
+
+    results = []
+    for name, setup, run, expected in build_scenarios(linkit, client, args, user_id, codes, folder_id):
+        if args.only and not any(part in name for part in args.only):
+            continue
+        results.append(run_scenario(name, setup, run, expected, args))
+
+    if args.json:
+        print(json.dumps({'backend': args.backend, 'links': args.links, 'results': results}, indent=2))
+        return
+    print(f"backend={args.backend} links={args.links} requests/route={args.requests}")
+    print(f"{'route':<30}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        print(f"{result['route']:<30}{result['throughput_rps']:>10}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}")
+
+
+if __name__ == '__main__':
+    main()
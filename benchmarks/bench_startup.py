@@ -0,0 +1,121 @@
+# Ukur cold start: waktu import `app` dan latensi request pertama, masing-masing di proses baru.
+#
+#   python benchmarks/bench_startup.py --runs 10 --budget-ms 400
+#   python benchmarks/bench_startup.py --backend supabase --path /abc123   (butuh SUPABASE_URL/KEY)
+#
+# Keluar dengan status 1 bila p50 import melebihi --budget-ms, jadi bisa dipasang di CI.
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, logging, sys, time
+sys.path.insert(0, {root!r})
+logging.disable(logging.CRITICAL)
+start = time.perf_counter()
+import app as linkit
+imported = time.perf_counter()
+response = linkit.app.test_client().get({path!r})
+response.get_data()
+done = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (done - imported) * 1000,
+    'status': response.status_code,
+    'supabase_loaded': 'supabase' in sys.modules
+}}))
+'''
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark cold start LinkIt.')
+    parser.add_argument('--backend', choices=('memory', 'sqlite', 'supabase'), default='memory')
+    parser.add_argument('--runs', type=int, default=10, help='jumlah proses baru yang diukur')
+    parser.add_argument('--path', default='/', help='route untuk request pertama')
+    parser.add_argument('--budget-ms', type=float, default=0, help='batas p50 waktu import (0 = tanpa batas)')
+    parser.add_argument('--top', type=int, default=10, help='tampilkan N import termahal (-X importtime)')
+    parser.add_argument('--json', action='store_true', help='cetak hasil sebagai JSON')
+    return parser.parse_args()
+
+
+def probe_env(args):
+    env = dict(os.environ, DATA_BACKEND=args.backend, CLICK_ANALYTICS='0')
+    if args.backend == 'sqlite':
+        env.setdefault('SQLITE_PATH', os.path.join(ROOT, 'bench.db'))
+        env.setdefault('LOCAL_STORAGE_DIR', os.path.join(ROOT, 'bench_storage'))
+    return env
+
+
+def run_probe(args, env):
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(root=ROOT, path=args.path)],
+        env=env, cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'Probe gagal:\n{result.stderr[-2000:]}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env, top):
+    # Modul level pertama di bawah `app` dengan waktu kumulatif terbesar
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import logging; logging.disable(logging.CRITICAL); import app'],
+        env=env, cwd=ROOT, capture_output=True, text=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)', line)
+        if match and len(match.group(2)) == 3:
+            entries.append((match.group(3), int(match.group(1)) / 1000))
+    return sorted(entries, key=lambda entry: entry[1], reverse=True)[:top]
+
+
+def main():
+    args = parse_args()
+    env = probe_env(args)
+    runs = [run_probe(args, env) for _ in range(args.runs)]
+    import_ms = [run['import_ms'] for run in runs]
+    first_ms = [run['first_request_ms'] for run in runs]
+    summary = {
+        'backend': args.backend,
+        'runs': len(runs),
+        'path': args.path,
+        'status': runs[-1]['status'],
+        'supabase_loaded_at_import': runs[-1]['supabase_loaded'],
+        'import_p50_ms': round(percentile(import_ms, 50), 1),
+        'import_p95_ms': round(percentile(import_ms, 95), 1),
+        'first_request_p50_ms': round(percentile(first_ms, 50), 1),
+        'first_request_p95_ms': round(percentile(first_ms, 95), 1),
+        'slowest_imports': [{'module': name, 'ms': round(ms, 1)} for name, ms in slowest_imports(env, args.top)] if args.top else []
+    }
+    over_budget = bool(args.budget_ms) and summary['import_p50_ms'] > args.budget_ms
+
+    if args.json:
+        print(json.dumps(dict(summary, budget_ms=args.budget_ms, over_budget=over_budget), indent=2))
+    else:
+        print(f"backend={args.backend} runs={len(runs)} path={args.path} status={summary['status']}")
+        print(f"import          p50 {summary['import_p50_ms']:>8} ms   p95 {summary['import_p95_ms']:>8} ms")
+        print(f"request pertama p50 {summary['first_request_p50_ms']:>8} ms   p95 {summary['first_request_p95_ms']:>8} ms")
+        for entry in summary['slowest_imports']:
+            print(f"  {entry['module']:<30}{entry['ms']:>10} ms")
+        if args.budget_ms:
+            print(f"budget import {args.budget_ms} ms: {'TERLAMPAUI' if over_budget else 'OK'}")
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import atexit
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+BOT_PATTERN = re.compile(r'bot|crawl|spider|slurp|preview|facebookexternalhit|curl|wget|python-requests|httpx', re.I)
+TABLET_PATTERN = re.compile(r'ipad|tablet|kindle|silk|playbook', re.I)
+MOBILE_PATTERN = re.compile(r'mobi|iphone|ipod|android|blackberry|opera mini|windows phone', re.I)
+
+
+def classify_user_agent(user_agent):
+    if not user_agent:
+        return 'other'
+    if BOT_PATTERN.search(user_agent):
+        return 'bot'
+    if TABLET_PATTERN.search(user_agent):
+        return 'tablet'
+    if MOBILE_PATTERN.search(user_agent):
+        return 'mobile'
+    return 'desktop'
+
+
+def referrer_host(referrer):
+    if not referrer:
+        return ''
+    try:
+        return (urlparse(referrer).hostname or '')[:255]
+    except ValueError:
+        return ''
+
+
+class ClickRecorder:
+    # Event klik masuk ke ring buffer in-process (yang tertua dibuang saat penuh).
+    # Thread flusher mengagregasi per (kode, menit, referrer, ua_class) lalu memanggil
+    # flush_fn(rows) sekali per batch saat buffer mencapai flush_size atau tiap flush_interval.
+    def __init__(self, flush_fn, buffer_size=10000, flush_size=500, flush_interval=10, max_pending=50000):
+        self.flush_fn = flush_fn
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffer = deque(maxlen=buffer_size)
+        self._pending = Counter()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.recorded = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.flush_errors = 0
+
+    def record(self, short_code, referrer=None, user_agent=None):
+        minute = int(time.time()) // 60 * 60
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append((short_code, minute, referrer_host(referrer), classify_user_agent(user_agent)))
+        self.recorded += 1
+        if len(self._buffer) >= self.flush_size:
+            self._wakeup.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='click-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            while self._buffer:
+                try:
+                    self._pending[self._buffer.popleft()] += 1
+                except IndexError:
+                    break
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, Counter()
+            rows = [
+                {
+                    'short_code': short_code,
+                    'minute': datetime.fromtimestamp(minute, timezone.utc).isoformat(),
+                    'referrer': referrer,
+                    'ua_class': ua_class,
+                    'clicks': clicks
+                }
+                for (short_code, minute, referrer, ua_class), clicks in batch.items()
+            ]
+            try:
+                self.flush_fn(rows)
+            except Exception as e:
+                self.flush_errors += 1
+                logging.error(f"Gagal menyimpan statistik klik: {str(e)}")
+                # Simpan lagi untuk percobaan berikutnya selama masih dalam batas
+                if len(batch) + len(self._pending) <= self.max_pending:
+                    self._pending.update(batch)
+                else:
+                    self.dropped += sum(batch.values())
+                return 0
+            self.flushed += sum(batch.values())
+            return len(rows)
+
+    def stats(self):
+        return {
+            'buffered': len(self._buffer),
+            'pending_rows': len(self._pending),
+            'recorded': self.recorded,
+            'flushed': self.flushed,
+            'dropped': self.dropped,
+            'flush_errors': self.flush_errors
+        }
@@ -0,0 +1,186 @@
+import hashlib
+import hmac
+import logging
+import math
+import random
+import string
+import threading
+import time
+
+BASE62 = string.digits + string.ascii_letters
+
+
+class DuplicateCodeError(Exception):
+    # Dilempar saat insert melanggar unique constraint short_code
+    pass
+
+
+def is_unique_violation(error):
+    if isinstance(error, DuplicateCodeError):
+        return True
+    # postgrest.exceptions.APIError membawa kode SQLSTATE Postgres
+    return getattr(error, 'code', None) == '23505' or 'duplicate key' in str(error)
+
+
+def encode_base62(number, length=0):
+    chars = []
+    while number:
+        number, rem = divmod(number, 62)
+        chars.append(BASE62[rem])
+    return ''.join(reversed(chars)).rjust(length, BASE62[0])
+
+
+class RandomAllocator:
+    # Skema lama: kode acak, tabrakan ditangani lewat retry saat insert
+    def __init__(self, length=6):
+        self.length = length
+        self._random = random.SystemRandom()
+
+    def allocate(self):
+        return ''.join(self._random.choice(string.ascii_letters + string.digits) for _ in range(self.length))
+
+    def allocate_many(self, count):
+        return [self.allocate() for _ in range(count)]
+
+
+class BlockAllocator:
+    # Tiap worker menyewa blok ID dari counter global (lease_fn(block_size) -> ID pertama)
+    # lalu membagikannya secara lokal. ID diacak dengan permutasi pseudo-acak berkunci
+    # (Feistel dengan HMAC), jadi kode unik satu sama lain tetapi tidak bisa ditebak dari
+    # counter tanpa `key`.
+    ROUNDS = 6
+
+    def __init__(self, lease_fn, key, block_size=100, length=6, fallback=None, retry_after=60):
+        self.lease_fn = lease_fn
+        self.key = key.encode('utf-8') if isinstance(key, str) else key
+        self.block_size = block_size
+        self.length = length
+        self.space = 62 ** length
+        self.fallback = fallback or RandomAllocator(length)
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._lease_failed_at = None
+        self.leases = 0
+
+    def _round(self, index, length, value, half_bits):
+        message = f"{length}:{index}:{value}".encode('ascii')
+        digest = hmac.new(self.key, message, hashlib.sha256).digest()
+        return int.from_bytes(digest[:8], 'big') & ((1 << half_bits) - 1)
+
+    def _permute(self, number, length):
+        # Feistel seimbang atas 2*half_bits >= log2(62^length) bit; hasil di luar ruang kode
+        # diputar ulang (cycle walking) sampai masuk, sehingga tetap bijeksi pada 62^length
+        space = 62 ** length
+        half_bits = ((space - 1).bit_length() + 1) // 2
+        mask = (1 << half_bits) - 1
+        while True:
+            left, right = number >> half_bits, number & mask
+            for index in range(self.ROUNDS):
+                left, right = right, left ^ self._round(index, length, right, half_bits)
+            number = (left << half_bits) | right
+            if number < space:
+                return number
+
+    def _scramble(self, number):
+        # Ruang kode 6 karakter habis: kode lebih panjang dengan permutasi yang sama per panjang
+        length = self.length
+        while number >= 62 ** length:
+            length += 1
+        return encode_base62(self._permute(number, length), length)
+
+    def _lease(self, size):
+        # Dipanggil dengan _lock terpegang; None berarti pakai fallback
+        if self._lease_failed_at and time.monotonic() - self._lease_failed_at < self.retry_after:
+            return None
+        try:
+            start = int(self.lease_fn(size))
+        except Exception as e:
+            logging.error(f"Gagal menyewa blok kode, pakai kode acak: {str(e)}")
+            self._lease_failed_at = time.monotonic()
+            return None
+        self._lease_failed_at = None
+        self._next, self._end = start, start + size
+        self.leases += 1
+        return start
+
+    def allocate(self):
+        with self._lock:
+            if self._next >= self._end and self._lease(self.block_size) is None:
+                return self.fallback.allocate()
+            number = self._next
+            self._next += 1
+        return self._scramble(number)
+
+    def allocate_many(self, count):
+        # Sisa blok dipakai dulu, kekurangannya disewa sekaligus dalam satu RPC
+        with self._lock:
+            take = min(count, self._end - self._next)
+            numbers = list(range(self._next, self._next + take))
+            self._next += take
+            missing = count - take
+            if missing and self._lease(max(self.block_size, missing)) is not None:
+                numbers.extend(range(self._next, self._next + missing))
+                self._next += missing
+                missing = 0
+        return [self._scramble(number) for number in numbers] + self.fallback.allocate_many(missing)
+
+
+class BloomFilter:
+    def __init__(self, capacity=1_000_000, error_rate=0.01):
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        with self._lock:
+            for pos in self._positions(item):
+                self._bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class TakenCodeFilter:
+    # Bloom filter kode yang sudah dipakai. Hasil "tidak ada" hanya dipercaya setelah
+    # warm-up selesai; sebelum itu (dan untuk jawaban "mungkin ada") cek ke database.
+    def __init__(self, capacity=1_000_000, error_rate=0.01):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.ready = False
+
+    def add(self, code):
+        self.bloom.add(code)
+
+    def maybe_taken(self, code):
+        return not self.ready or code in self.bloom
+
+    def warm(self, fetch_page, page_size=1000):
+        # fetch_page(after, limit) -> daftar short_code terurut setelah `after`
+        def run():
+            after = ''
+            try:
+                while True:
+                    codes = fetch_page(after, page_size)
+                    for code in codes:
+                        self.bloom.add(code)
+                    if len(codes) < page_size:
+                        break
+                    after = codes[-1]
+                self.ready = True
+                logging.debug(f"Bloom filter kode siap: {self.bloom.count} kode")
+            except Exception as e:
+                logging.error(f"Gagal memuat bloom filter kode: {str(e)}")
+
+        thread = threading.Thread(target=run, name='code-bloom-warmup', daemon=True)
+        thread.start()
+        return thread
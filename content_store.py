@@ -0,0 +1,180 @@
+import hashlib
+import io
+import os
+import shutil
+import threading
+
+from werkzeug.http import parse_range_header, quote_etag, unquote_etag
+from werkzeug.utils import safe_join
+
+LOCAL_STORAGE_PREFIX = '/local-storage/content/'
+
+
+class StoredObject:
+    # Objek yang sudah dibuka, dengan antarmuka yang sama seperti httpx.Response (stream=True):
+    # status_code, headers, iter_bytes(chunk_size), read(), close()
+    def __init__(self, status_code, headers, reader=None, length=0):
+        self.status_code = status_code
+        self.headers = headers
+        self._reader = reader
+        self._remaining = length
+
+    def iter_bytes(self, chunk_size=64 * 1024):
+        while self._reader is not None and self._remaining > 0:
+            chunk = self._reader.read(min(chunk_size, self._remaining))
+            if not chunk:
+                break
+            self._remaining -= len(chunk)
+            yield chunk
+
+    def read(self):
+        return b''.join(self.iter_bytes())
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+class SupabaseContentStore:
+    def __init__(self, client, bucket='content'):
+        self.client = client
+        self.bucket = bucket
+
+    def upload(self, path, data, content_type):
+        # data: bytes atau file biner hasil open(); file di-stream oleh httpx tanpa dibaca utuh
+        try:
+            self.client.storage.from_(self.bucket).upload(path, data, {'content-type': content_type})
+        except Exception as e:
+            if 'Duplicate' in str(e) or '409' in str(e):
+                raise FileExistsError(f"Objek sudah ada: {path}") from e
+            raise
+
+    def public_url(self, path):
+        return self.client.storage.from_(self.bucket).get_public_url(path)
+
+    def remove(self, paths):
+        self.client.storage.from_(self.bucket).remove(paths)
+
+    def signed_url(self, path, expires_in, download_name=None):
+        options = {'download': download_name} if download_name else {}
+        return self.client.storage.from_(self.bucket).create_signed_url(path, expires_in, options)['signedURL']
+
+    def open(self, path, headers=None):
+        # Range/If-None-Match diteruskan ke Supabase Storage sehingga 206/304 dan ETag datang dari sana
+        session = self.client.storage.session
+        request = session.build_request('GET', f'object/{self.bucket}/{path}', headers=headers or {})
+        return session.send(request, stream=True)
+
+
+class LocalContentStore:
+    # Pengganti bucket `content` di disk lokal, dilayani app di LOCAL_STORAGE_PREFIX
+    serves_locally = True
+
+    def __init__(self, directory='local_storage'):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _full_path(self, path):
+        full_path = safe_join(self.directory, path)
+        if full_path is None:
+            raise ValueError(f"Path tidak valid: {path}")
+        return full_path
+
+    def upload(self, path, data, content_type):
+        full_path = self._full_path(path)
+        if os.path.exists(full_path):
+            raise FileExistsError(f"Objek sudah ada: {path}")
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            if isinstance(data, (bytes, bytearray)):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f)
+
+    def public_url(self, path):
+        return LOCAL_STORAGE_PREFIX + path
+
+    def remove(self, paths):
+        for path in paths:
+            try:
+                os.remove(self._full_path(path))
+            except (FileNotFoundError, ValueError):
+                pass
+
+    def signed_url(self, path, expires_in, download_name=None):
+        return self.public_url(path)
+
+    def _stat(self, path):
+        full_path = self._full_path(path)
+        stat = os.stat(full_path)
+        etag = hashlib.sha1(f'{stat.st_size}-{stat.st_mtime_ns}'.encode('utf-8')).hexdigest()
+        return full_path, stat.st_size, etag
+
+    def _open_reader(self, path):
+        return open(self._full_path(path), 'rb')
+
+    def open(self, path, headers=None):
+        try:
+            _, size, etag = self._stat(path)
+        except (FileNotFoundError, ValueError):
+            return StoredObject(404, {})
+        return conditional_object(self._open_reader(path), size, etag, headers or {})
+
+
+class MemoryContentStore(LocalContentStore):
+    # Bucket di memori proses untuk benchmark; tidak menyentuh disk
+    def __init__(self):
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def upload(self, path, data, content_type):
+        with self._lock:
+            if path in self._objects:
+                raise FileExistsError(f"Objek sudah ada: {path}")
+            self._objects[path] = bytes(data) if isinstance(data, (bytes, bytearray)) else data.read()
+
+    def remove(self, paths):
+        with self._lock:
+            for path in paths:
+                self._objects.pop(path, None)
+
+    def _stat(self, path):
+        data = self._objects[path]
+        return path, len(data), hashlib.sha1(data).hexdigest()
+
+    def _open_reader(self, path):
+        return io.BytesIO(self._objects[path])
+
+    def open(self, path, headers=None):
+        if path not in self._objects:
+            return StoredObject(404, {})
+        return super().open(path, headers)
+
+
+def conditional_object(reader, size, etag, headers):
+    # Jawab If-None-Match dan Range (satu rentang) seperti yang dilakukan Supabase Storage
+    response_headers = {'ETag': quote_etag(etag), 'Accept-Ranges': 'bytes'}
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match and (if_none_match.strip() == '*' or etag in [unquote_etag(tag.strip())[0] for tag in if_none_match.split(',')]):
+        reader.close()
+        return StoredObject(304, response_headers)
+
+    byte_range = parse_range_header(headers.get('Range'))
+    if_range = headers.get('If-Range')
+    if byte_range is not None and if_range and unquote_etag(if_range)[0] != etag:
+        byte_range = None
+    if byte_range is not None:
+        bounds = byte_range.range_for_length(size)
+        if bounds is None:
+            reader.close()
+            response_headers['Content-Range'] = f'bytes */{size}'
+            return StoredObject(416, response_headers)
+        start, stop = bounds
+        reader.seek(start)
+        response_headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+        response_headers['Content-Length'] = str(stop - start)
+        return StoredObject(206, response_headers, reader, stop - start)
+
+    response_headers['Content-Length'] = str(size)
+    return StoredObject(200, response_headers, reader, size)
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+
+from werkzeug.http import quote_etag
+
+
+def parse_timestamp(value):
+    # created_at dari Supabase/SQLite (ISO 8601) -> datetime UTC tanpa mikrodetik
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def link_validators(link, *parts):
+    # ETag diturunkan dari baris link (+ bagian lain yang memengaruhi output, mis. user dan
+    # versi template), Last-Modified dari created_at. Keduanya bisa dihitung tanpa render.
+    fields = [link.get(name) for name in ('short_code', 'content_type', 'content', 'created_at', 'content_hash', 'file_name')]
+    seed = '\x1f'.join(str(value) for value in (*fields, *parts))
+    etag = hashlib.sha1(seed.encode('utf-8')).hexdigest()[:20]
+    return etag, parse_timestamp(link.get('created_at'))
+
+
+def is_not_modified(request, etag, last_modified=None):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def apply_validators(response, etag, last_modified=None, cache_control=None):
+    response.headers['ETag'] = quote_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def files_fingerprint(paths):
+    # Hash isi beberapa file (mis. template) untuk ikut dalam ETag halaman
+    digest = hashlib.sha1()
+    latest = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+        latest = max(latest, os.path.getmtime(path))
+    return digest.hexdigest()[:12], datetime.fromtimestamp(int(latest), timezone.utc)
+
+
+class AssetFingerprints:
+    # Fingerprint isi file statis untuk URL /static/...?v=<hash>. Dihitung ulang bila
+    # mtime/ukuran berubah, jadi tetap benar selama development.
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def version(self, filename):
+        path = os.path.join(self.static_folder, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._cache.get(filename)
+            if cached and cached[0] == key:
+                return cached[1]
+        with open(path, 'rb') as f:
+            version = hashlib.sha1(f.read()).hexdigest()[:10]
+        with self._lock:
+            self._cache[filename] = (key, version)
+        return version
@@ -0,0 +1,46 @@
+import io
+
+# Pillow opsional: tanpa Pillow halaman konten tetap memakai gambar asli
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+IMAGE_EXTENSIONS = ('jpg', 'jpeg', 'png')
+VARIANT_FORMATS = ('webp', 'orig')
+
+
+def available():
+    return Image is not None
+
+
+def variant_path(file_path, width, fmt):
+    # Disimpan di samping objek asli: objects/ab/<hash>.jpg -> objects/ab/<hash>.w640.webp
+    base, ext = file_path.rsplit('.', 1)
+    return f"{base}.w{width}.{'webp' if fmt == 'webp' else ext.lower()}"
+
+
+def variant_paths(file_path, widths):
+    if '.' not in file_path or file_path.rsplit('.', 1)[1].lower() not in IMAGE_EXTENSIONS:
+        return []
+    return [variant_path(file_path, width, fmt) for width in widths for fmt in VARIANT_FORMATS]
+
+
+def render_variant(data, width, fmt, source_ext):
+    # Perkecil ke lebar `width` (tidak pernah diperbesar) lalu encode ke WebP atau format asli
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = max(round(image.height * width / image.width), 1)
+            image = image.resize((width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        if fmt == 'webp':
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+            image.save(output, 'WEBP', quality=80, method=4)
+        elif source_ext in ('jpg', 'jpeg'):
+            image.convert('RGB').save(output, 'JPEG', quality=82, optimize=True, progressive=True)
+        else:
+            image.save(output, 'PNG', optimize=True)
+        return output.getvalue()
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel untuk membedakan "tidak ada di cache" dari "diketahui tidak ada" (None)
+MISSING = object()
+
+
+class LinkCache:
+    # LRU + TTL untuk link yang sudah di-resolve. Kode yang tidak ditemukan disimpan
+    # di cache negatif terpisah agar scanner 404 tidak bisa menggusur link yang populer.
+    def __init__(self, max_entries=1024, ttl=60, negative_max_entries=4096, negative_ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_max_entries = negative_max_entries
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._negative = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, short_code):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(short_code)
+            if entry is not None:
+                expires_at, link = entry
+                if expires_at > now:
+                    self._entries.move_to_end(short_code)
+                    self.hits += 1
+                    return link
+                del self._entries[short_code]
+                self.expirations += 1
+            expires_at = self._negative.get(short_code)
+            if expires_at is not None:
+                if expires_at > now:
+                    self._negative.move_to_end(short_code)
+                    self.negative_hits += 1
+                    return None
+                del self._negative[short_code]
+                self.expirations += 1
+            self.misses += 1
+            return MISSING
+
+    def set(self, short_code, link):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._negative.pop(short_code, None)
+            self._entries[short_code] = (time.monotonic() + self.ttl, link)
+            self._entries.move_to_end(short_code)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_missing(self, short_code):
+        if self.negative_max_entries <= 0 or self.negative_ttl <= 0:
+            return
+        with self._lock:
+            self._entries.pop(short_code, None)
+            self._negative[short_code] = time.monotonic() + self.negative_ttl
+            self._negative.move_to_end(short_code)
+            while len(self._negative) > self.negative_max_entries:
+                self._negative.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *short_codes):
+        with self._lock:
+            for short_code in short_codes:
+                removed = self._entries.pop(short_code, None) is not None
+                removed = self._negative.pop(short_code, None) is not None or removed
+                if removed:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._negative.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'negative_size': len(self._negative),
+                'negative_max_entries': self.negative_max_entries,
+                'negative_ttl': self.negative_ttl,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'hit_ratio': round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+            }
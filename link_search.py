@@ -0,0 +1,124 @@
+import re
+import threading
+from collections import OrderedDict
+
+# Panjang maksimum bagian konten yang ikut dicari (sama dengan kolom links.search_text di README)
+SEARCH_TEXT_CHARS = 200
+# Skema opsional agar kata kunci 'www.example' juga cocok; URL link selalu tersimpan dengan
+# skema, jadi search_text tetap sama dengan kolom generated di README
+URL_PREFIX = re.compile(r'^(https?://)?(www\.)?', re.IGNORECASE)
+
+
+def search_text(link):
+    # Short code + host/path URL, preview teks atau nama file; huruf kecil semua
+    content_type = link.get('content_type')
+    if content_type in ('image', 'document'):
+        body = link.get('file_name') or ''
+    else:
+        body = link.get('content') or ''
+        if content_type == 'url':
+            body = URL_PREFIX.sub('', body)
+    return f"{link['short_code']} {body[:SEARCH_TEXT_CHARS]}".lower()
+
+
+def normalize_query(query):
+    # Prefix URL dibuang seperti di search_text, jadi URL lengkap yang ditempel tetap cocok
+    return URL_PREFIX.sub('', ' '.join((query or '').split())).lower()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class UserIndex:
+    def __init__(self, links=()):
+        self.texts = {}
+        self.postings = {}
+        for link in links:
+            self.add(link['short_code'], search_text(link))
+
+    def add(self, short_code, text):
+        self.remove(short_code)
+        self.texts[short_code] = text
+        for gram in trigrams(text):
+            self.postings.setdefault(gram, set()).add(short_code)
+
+    def remove(self, short_code):
+        text = self.texts.pop(short_code, None)
+        if text is None:
+            return None
+        for gram in trigrams(text):
+            codes = self.postings.get(gram)
+            if codes is not None:
+                codes.discard(short_code)
+                if not codes:
+                    del self.postings[gram]
+        return text
+
+    def search(self, query):
+        if len(query) < 3:
+            return [code for code, text in self.texts.items() if query in text]
+        # Mulai dari posting list terpendek; trigram bisa cocok tanpa substring-nya cocok,
+        # jadi kandidat tetap dicek ulang
+        candidates = None
+        for gram in sorted(trigrams(query), key=lambda gram: len(self.postings.get(gram, ()))):
+            codes = self.postings.get(gram)
+            if not codes:
+                return []
+            candidates = set(codes) if candidates is None else candidates & codes
+        return [code for code in candidates if query in self.texts[code]]
+
+
+class SearchIndex:
+    # Indeks trigram per user di memori proses untuk backend lokal. Dibangun dari database saat
+    # user pertama kali mencari, lalu diperbarui per insert/rename/delete; hanya `max_users`
+    # user yang terakhir mencari yang disimpan (LRU).
+    def __init__(self, max_users=64):
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def search(self, user_id, query, loader):
+        # loader(user_id) -> baris link user (short_code, content_type, content, file_name)
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                index = UserIndex(loader(user_id))
+                self.builds += 1
+                self._users[user_id] = index
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            else:
+                self._users.move_to_end(user_id)
+            return index.search(query)
+
+    def add(self, links):
+        with self._lock:
+            for link in links:
+                index = self._users.get(link.get('user_id'))
+                if index is not None:
+                    index.add(link['short_code'], search_text(link))
+
+    def remove(self, user_id, short_codes):
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is not None:
+                for short_code in short_codes:
+                    index.remove(short_code)
+
+    def rename(self, user_id, old_code, new_code):
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is not None:
+                text = index.remove(old_code)
+                if text is not None:
+                    index.add(new_code, new_code.lower() + text[len(old_code):])
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'links': sum(len(index.texts) for index in self._users.values()),
+                'builds': self.builds
+            }
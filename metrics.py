@@ -0,0 +1,130 @@
+import bisect
+import functools
+import threading
+import time
+
+from flask import g, has_app_context
+
+# Batas bucket histogram dalam detik (gaya Prometheus)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, seconds):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += seconds
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = {labels: (list(counts), count, total) for labels, (counts, count, total) in self._series.items()}
+        for labels, (counts, count, total) in sorted(snapshot.items()):
+            base = format_labels(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{base}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {count}')
+        return lines
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(pairs):
+    return ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs)
+
+
+def render_gauges(prefix, values, help_text):
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f'{prefix}_{key}'
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+    return lines
+
+
+request_duration = Histogram(
+    'linkit_request_duration_seconds', 'Durasi request per route.', ('route', 'method', 'status')
+)
+backend_call_duration = Histogram(
+    'linkit_backend_call_duration_seconds', 'Durasi panggilan database/storage per operasi.', ('kind', 'operation')
+)
+template_render_duration = Histogram(
+    'linkit_template_render_seconds', 'Durasi render template.', ('template',)
+)
+
+
+def record_timing(kind, name, seconds):
+    # Simpan ke daftar timing request aktif (dipakai Server-Timing dan slow log)
+    if has_app_context():
+        timings = g.get('timings')
+        if timings is None:
+            timings = g.timings = []
+        timings.append((kind, name, seconds))
+
+
+class InstrumentedBackend:
+    # Proxy yang mengukur setiap pemanggilan method repository/content store
+    def __init__(self, target, kind):
+        self._target = target
+        self._kind = kind
+        self._wrapped = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            kind = self._kind
+
+            @functools.wraps(attr)
+            def wrapped(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    backend_call_duration.observe((kind, name), elapsed)
+                    record_timing(kind, name, elapsed)
+
+            self._wrapped[name] = wrapped
+        return wrapped
+
+
+def server_timing_header(timings, total_seconds):
+    parts = []
+    for kind, label in (('db', 'database'), ('storage', 'storage'), ('tpl', 'template')):
+        entries = [seconds for entry_kind, _, seconds in timings if entry_kind == kind]
+        if entries:
+            parts.append(f'{kind};dur={sum(entries) * 1000:.2f};desc="{label} x{len(entries)}"')
+    parts.append(f'total;dur={total_seconds * 1000:.2f}')
+    return ', '.join(parts)
+
+
+def render_metrics(extra_lines=()):
+    lines = []
+    for histogram in (request_duration, backend_call_duration, template_render_duration):
+        lines += histogram.render()
+    lines += list(extra_lines)
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,41 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueryFanOut:
+    # Menjalankan query yang saling independen secara paralel agar latensi halaman
+    # = query terlama, bukan jumlah semua round trip. Pool dibagi antar request dan
+    # baru dibuat saat pertama dipakai; konteks request (g, session) ikut disalin ke thread.
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='query-fanout')
+        return self._executor
+
+    def run(self, *calls):
+        # Hasil dikembalikan sesuai urutan calls; exception dari salah satu call diteruskan
+        if self.max_workers <= 0 or len(calls) < 2:
+            return [call() for call in calls]
+        executor = self._get_executor()
+        futures = [executor.submit(contextvars.copy_context().run, call) for call in calls[1:]]
+        try:
+            first = calls[0]()
+        except Exception:
+            # Tunggu sisa query agar tidak ada yang masih memakai konteks request setelah ini
+            for future in futures:
+                future.exception()
+            raise
+        return [first, *[future.result() for future in futures]]
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
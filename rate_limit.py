@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+
+def parse_budget(value):
+    # '<jumlah>/<detik>' -> (burst, token per detik); '0' atau kosong = tanpa batas
+    if not value or value.strip() in ('0', 'off'):
+        return None
+    count, _, seconds = value.partition('/')
+    burst = float(count)
+    seconds = float(seconds or 60)
+    if burst <= 0 or seconds <= 0:
+        return None
+    return burst, burst / seconds
+
+
+class TokenBuckets:
+    # Token bucket per key di memori proses. Jumlah key dibatasi `max_keys` (LRU); key yang
+    # tergusur mulai lagi dengan bucket penuh.
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def take(self, key, burst, rate, cost=1):
+        # Kembalikan 0 bila token cukup, selain itu jumlah detik sampai token cukup
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            retry_after = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                retry_after = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+            return retry_after
+
+    def stats(self):
+        with self._lock:
+            return {'keys': len(self._buckets), 'evictions': self.evictions}
+
+
+# Token bucket atomik di Redis; waktu diambil dari server Redis agar semua worker sepakat
+REDIS_TAKE_SCRIPT = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisTokenBuckets:
+    # Bucket bersama untuk banyak worker/instance (butuh paket `redis`, opsional). Bila Redis
+    # tidak bisa dihubungi, bucket lokal dipakai selama `retry_interval` detik.
+    def __init__(self, url, fallback, prefix='linkit:rl:', timeout=0.05, retry_interval=30):
+        self.url = url
+        self.fallback = fallback
+        self.prefix = prefix
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.errors = 0
+        self._script = None
+        self._down_until = 0
+        self._lock = threading.Lock()
+
+    def _get_script(self):
+        if self._script is None:
+            with self._lock:
+                if self._script is None:
+                    import redis
+                    client = redis.Redis.from_url(self.url, socket_timeout=self.timeout, socket_connect_timeout=self.timeout)
+                    self._script = client.register_script(REDIS_TAKE_SCRIPT)
+        return self._script
+
+    def take(self, key, burst, rate, cost=1):
+        if time.monotonic() < self._down_until:
+            return self.fallback.take(key, burst, rate, cost)
+        try:
+            return float(self._get_script()(keys=[self.prefix + key], args=[burst, rate, cost]))
+        except Exception as e:
+            self.errors += 1
+            self._down_until = time.monotonic() + self.retry_interval
+            logging.warning(f"Rate limit Redis gagal, memakai bucket lokal: {str(e)}")
+            return self.fallback.take(key, burst, rate, cost)
+
+    def stats(self):
+        return dict(self.fallback.stats(), redis_errors=self.errors)
+
+
+class RateLimiter:
+    # Anggaran terpisah per jenis aksi (mis. create, resolve, download, login); setiap
+    # request harus lolos bucket semua identitasnya (IP dan, bila login, user).
+    def __init__(self, budgets, buckets):
+        self.budgets = {name: budget for name, budget in budgets.items() if budget}
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.rejected = {name: 0 for name in self.budgets}
+
+    def enabled(self, name):
+        return name in self.budgets
+
+    def check(self, name, identities, cost=1):
+        burst, rate = self.budgets[name]
+        retry_after = 0.0
+        for identity in identities:
+            retry_after = max(retry_after, self.buckets.take(f"{name}:{identity}", burst, rate, cost))
+        if retry_after:
+            with self._lock:
+                self.rejected[name] += 1
+        return retry_after
+
+    def stats(self):
+        with self._lock:
+            stats = {f"rejected_{name}": count for name, count in self.rejected.items()}
+        return dict(stats, **self.buckets.stats())
+
+
+class ConcurrencyLimiter:
+    # Load shedding: batasi jumlah request mahal yang sedang berjalan di proses ini agar
+    # redirect tetap punya thread/CPU saat terjadi lonjakan upload atau download.
+    def __init__(self, max_inflight=0):
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.max_inflight:
+            return True
+        with self._lock:
+            if self.inflight >= self.max_inflight:
+                self.shed += 1
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self):
+        if not self.max_inflight:
+            return
+        with self._lock:
+            self.inflight = max(self.inflight - 1, 0)
+
+    def stats(self):
+        with self._lock:
+            return {'inflight': self.inflight, 'max_inflight': self.max_inflight, 'shed': self.shed}
@@ -0,0 +1,521 @@
+import json
+import logging
+import sqlite3
+import threading
+
+from code_allocator import DuplicateCodeError, is_unique_violation
+from link_search import SearchIndex
+
+LINK_COLUMNS = (
+    'id', 'short_code', 'content_type', 'content', 'user_id', 'folder_id', 'created_at', 'click_count',
+    'file_name', 'content_hash', 'content_size'
+)
+
+
+def like_pattern(search):
+    # Substring ilike PostgREST (* = %); wildcard LIKE dari input user di-escape
+    escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_').replace('*', '')
+    return f'*{escaped}*'
+
+
+def parse_columns(columns):
+    if columns == '*':
+        return list(LINK_COLUMNS)
+    names = [name.strip() for name in columns.split(',')]
+    unknown = [name for name in names if name not in LINK_COLUMNS]
+    if unknown:
+        raise ValueError(f"Kolom tidak dikenal: {', '.join(unknown)}")
+    return names
+
+
+class SupabaseRepository:
+    def __init__(self, client):
+        self.client = client
+
+    # Links
+    def get_link(self, short_code):
+        response = self.client.table('links').select('*').eq('short_code', short_code).execute()
+        return response.data[0] if response.data else None
+
+    def code_exists(self, short_code):
+        response = self.client.table('links').select('short_code').eq('short_code', short_code).execute()
+        return len(response.data) > 0
+
+    def list_codes_after(self, after, limit):
+        response = self.client.table('links').select('short_code').gt('short_code', after).order('short_code').limit(limit).execute()
+        return [row['short_code'] for row in response.data]
+
+    def insert_link(self, row):
+        try:
+            self.client.table('links').insert(row).execute()
+        except Exception as e:
+            if is_unique_violation(e):
+                raise DuplicateCodeError(row['short_code']) from e
+            raise
+
+    def insert_links(self, rows):
+        # Satu insert multi-row (satu transaksi): bila ada kode bentrok, tidak ada baris yang masuk
+        try:
+            self.client.table('links').insert(rows, returning='minimal').execute()
+        except Exception as e:
+            if is_unique_violation(e):
+                raise DuplicateCodeError(', '.join(row['short_code'] for row in rows)) from e
+            raise
+
+    def existing_codes(self, short_codes):
+        if not short_codes:
+            return set()
+        response = self.client.table('links').select('short_code').in_('short_code', short_codes).execute()
+        return {row['short_code'] for row in response.data}
+
+    def get_user_links(self, user_id, short_codes, columns='*'):
+        return self.client.table('links').select(columns).eq('user_id', user_id).in_('short_code', short_codes).execute().data
+
+    def delete_user_links(self, user_id, short_codes):
+        self.client.table('links').delete().eq('user_id', user_id).in_('short_code', short_codes).execute()
+
+    def rename_link(self, user_id, old_code, new_code):
+        try:
+            self.client.table('links').update({'short_code': new_code}).eq('short_code', old_code).eq('user_id', user_id).execute()
+        except Exception as e:
+            if is_unique_violation(e):
+                raise DuplicateCodeError(new_code) from e
+            raise
+
+    def move_links(self, user_id, short_codes, folder_id):
+        self.client.table('links').update({'folder_id': folder_id}).eq('user_id', user_id).in_('short_code', short_codes).execute()
+
+    def _filter_links(self, query, user_id, folder_id, content_type, search=None):
+        query = query.eq('user_id', user_id)
+        if folder_id is not None:
+            query = query.eq('folder_id', folder_id)
+        if content_type:
+            query = query.eq('content_type', content_type)
+        if search:
+            # Kolom generated search_text dengan index trigram (lihat README)
+            query = query.ilike('search_text', like_pattern(search))
+        return query
+
+    def count_links(self, user_id, folder_id=None, content_type=None, count='exact', search=None):
+        # Hanya header Content-Range yang dipakai, baris tidak ikut ditransfer
+        query = self.client.table('links').select('short_code', count=count)
+        return self._filter_links(query, user_id, folder_id, content_type, search).limit(1).execute().count or 0
+
+    def list_links(self, user_id, folder_id=None, content_type=None, cursor=None, offset=0, limit=10, columns='*', count=None, search=None):
+        query = self._filter_links(self.client.table('links').select(columns, count=count), user_id, folder_id, content_type, search)
+        query = query.order('created_at', desc=True).order('short_code', desc=True)
+        if cursor:
+            created_at, short_code = cursor
+            query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",short_code.lt."{short_code}")')
+            query = query.limit(limit)
+        else:
+            query = query.range(offset, offset + limit - 1)
+        response = query.execute()
+        return response.data, response.count
+
+    def lease_code_block(self, block_size):
+        return self.client.rpc('lease_code_block', {'block_size': block_size}).execute().data
+
+    def record_clicks(self, rows):
+        self.client.rpc('record_link_clicks', {'rows': rows}).execute()
+
+    def click_series(self, short_code, since, bucket):
+        return self.client.rpc('link_click_series', {
+            'p_short_code': short_code,
+            'p_since': since,
+            'p_bucket': bucket
+        }).execute().data or []
+
+    # Users
+    def email_exists(self, email, exclude_user_id=None):
+        query = self.client.table('users').select('email').eq('email', email)
+        if exclude_user_id:
+            query = query.neq('id', exclude_user_id)
+        return len(query.execute().data) > 0
+
+    def create_user(self, email, password):
+        return self.client.table('users').insert({'email': email, 'password': password}).execute().data[0]
+
+    def find_user(self, email, password):
+        response = self.client.table('users').select('*').eq('email', email).eq('password', password).execute()
+        return response.data[0] if response.data else None
+
+    def update_user(self, user_id, updates):
+        self.client.table('users').update(updates).eq('id', user_id).execute()
+
+    # Folders
+    def list_folders(self, user_id):
+        return self.client.table('folders').select('*').eq('user_id', user_id).execute().data
+
+    def folder_name_exists(self, name, user_id):
+        response = self.client.table('folders').select('name').eq('name', name).eq('user_id', user_id).execute()
+        return len(response.data) > 0
+
+    def create_folder(self, name, user_id):
+        self.client.table('folders').insert({'name': name, 'user_id': user_id}).execute()
+
+    def owned_folder_ids(self, user_id, folder_ids):
+        response = self.client.table('folders').select('id').eq('user_id', user_id).in_('id', folder_ids).execute()
+        return {str(row['id']) for row in response.data}
+
+    def delete_folders(self, user_id, folder_ids):
+        # Link di dalamnya menjadi folder_id NULL lewat on delete set null
+        self.client.table('folders').delete().eq('user_id', user_id).in_('id', folder_ids).execute()
+
+    # Objek file per hash isi (dedup); ref_count = jumlah link yang memakainya
+    def acquire_content(self, content_hash):
+        # Tambah satu referensi bila objek sudah ada; kembalikan path-nya atau None
+        return self.client.rpc('acquire_content_object', {'p_hash': content_hash}).execute().data
+
+    def register_content(self, content_hash, path, size, mimetype):
+        return self.client.rpc('register_content_object', {
+            'p_hash': content_hash,
+            'p_path': path,
+            'p_size': size,
+            'p_mimetype': mimetype
+        }).execute().data
+
+    def release_content(self, content_hashes):
+        # Kurangi referensi (satu per hash di list); kembalikan path objek yang tidak dipakai lagi
+        if not content_hashes:
+            return []
+        rows = self.client.rpc('release_content_objects', {'p_hashes': list(content_hashes)}).execute().data or []
+        return [row['path'] for row in rows]
+
+
+SQLITE_SCHEMA = """
+create table if not exists users (
+    id integer primary key autoincrement,
+    email text not null unique,
+    password text not null
+);
+create table if not exists folders (
+    id integer primary key autoincrement,
+    name text not null,
+    user_id integer not null references users (id) on delete cascade
+);
+create table if not exists links (
+    id integer primary key autoincrement,
+    short_code text not null unique,
+    content_type text not null,
+    content text,
+    user_id integer references users (id) on delete cascade,
+    folder_id integer references folders (id) on delete set null,
+    created_at text not null default (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    click_count integer not null default 0,
+    file_name text,
+    content_hash text,
+    content_size integer
+);
+create index if not exists links_user_created_idx on links (user_id, created_at desc, short_code desc);
+create table if not exists link_clicks (
+    short_code text not null references links (short_code) on delete cascade on update cascade,
+    minute text not null,
+    referrer text not null default '',
+    ua_class text not null default '',
+    clicks integer not null default 0,
+    primary key (short_code, minute, referrer, ua_class)
+);
+create table if not exists code_counter (
+    id integer primary key,
+    next_id integer not null
+);
+insert or ignore into code_counter (id, next_id) values (1, 1);
+create table if not exists content_objects (
+    content_hash text primary key,
+    path text not null,
+    size integer not null,
+    mimetype text not null,
+    ref_count integer not null default 0,
+    created_at text not null default (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+"""
+
+
+class SQLiteRepository:
+    # Backend lokal untuk development, load test dan profiling tanpa project Supabase.
+    # Satu koneksi dipakai bersama semua thread, diserialisasi dengan lock.
+    # Pencarian memakai indeks trigram in-process (link_search.SearchIndex).
+    def __init__(self, path='linkit.db', search_index_users=64):
+        self.path = path
+        self.search_index = SearchIndex(search_index_users)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('pragma foreign_keys = on')
+        if path != ':memory:':
+            self.conn.execute('pragma journal_mode = wal')
+        self.conn.executescript(SQLITE_SCHEMA)
+        self._migrate()
+        logging.debug(f"SQLite repository siap: {path}")
+
+    def _migrate(self):
+        # Kolom yang ditambahkan setelah tabel links dibuat di file database lama
+        existing = {row['name'] for row in self.conn.execute('pragma table_info(links)').fetchall()}
+        for column, column_type in (('file_name', 'text'), ('content_hash', 'text'), ('content_size', 'integer')):
+            if column not in existing:
+                self.conn.execute(f'alter table links add column {column} {column_type}')
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params)
+
+    @staticmethod
+    def _placeholders(values):
+        return ', '.join('?' for _ in values)
+
+    # Links
+    def get_link(self, short_code):
+        rows = self._query('select * from links where short_code = ?', (short_code,))
+        return rows[0] if rows else None
+
+    def code_exists(self, short_code):
+        return bool(self._query('select 1 from links where short_code = ?', (short_code,)))
+
+    def list_codes_after(self, after, limit):
+        rows = self._query('select short_code from links where short_code > ? order by short_code limit ?', (after, limit))
+        return [row['short_code'] for row in rows]
+
+    def insert_link(self, row):
+        names = [name for name in row if name in LINK_COLUMNS]
+        try:
+            self._execute(
+                f"insert into links ({', '.join(names)}) values ({self._placeholders(names)})",
+                [row[name] for name in names]
+            )
+        except sqlite3.IntegrityError as e:
+            if 'short_code' in str(e):
+                raise DuplicateCodeError(row['short_code']) from e
+            raise
+        self.search_index.add([row])
+
+    def insert_links(self, rows):
+        if not rows:
+            return
+        names = [name for name in rows[0] if name in LINK_COLUMNS]
+        with self._lock:
+            self.conn.execute('begin')
+            try:
+                self.conn.executemany(
+                    f"insert into links ({', '.join(names)}) values ({self._placeholders(names)})",
+                    [[row[name] for name in names] for row in rows]
+                )
+                self.conn.execute('commit')
+            except sqlite3.IntegrityError as e:
+                self.conn.execute('rollback')
+                if 'short_code' in str(e):
+                    raise DuplicateCodeError(', '.join(row['short_code'] for row in rows)) from e
+                raise
+            except Exception:
+                self.conn.execute('rollback')
+                raise
+        self.search_index.add(rows)
+
+    def existing_codes(self, short_codes):
+        if not short_codes:
+            return set()
+        rows = self._query(f"select short_code from links where short_code in ({self._placeholders(short_codes)})", list(short_codes))
+        return {row['short_code'] for row in rows}
+
+    def get_user_links(self, user_id, short_codes, columns='*'):
+        if not short_codes:
+            return []
+        names = parse_columns(columns)
+        return self._query(
+            f"select {', '.join(names)} from links where user_id = ? and short_code in ({self._placeholders(short_codes)})",
+            [user_id, *short_codes]
+        )
+
+    def delete_user_links(self, user_id, short_codes):
+        if not short_codes:
+            return
+        self._execute(
+            f"delete from links where user_id = ? and short_code in ({self._placeholders(short_codes)})",
+            [user_id, *short_codes]
+        )
+        self.search_index.remove(user_id, short_codes)
+
+    def rename_link(self, user_id, old_code, new_code):
+        try:
+            self._execute('update links set short_code = ? where short_code = ? and user_id = ?', (new_code, old_code, user_id))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateCodeError(new_code) from e
+        self.search_index.rename(user_id, old_code, new_code)
+
+    def move_links(self, user_id, short_codes, folder_id):
+        if not short_codes:
+            return
+        self._execute(
+            f"update links set folder_id = ? where user_id = ? and short_code in ({self._placeholders(short_codes)})",
+            [folder_id, user_id, *short_codes]
+        )
+
+    def _search_rows(self, user_id):
+        return self._query('select short_code, content_type, content, file_name from links where user_id = ?', (user_id,))
+
+    def _link_filters(self, user_id, folder_id, content_type, search=None):
+        clauses, params = ['user_id = ?'], [user_id]
+        if folder_id is not None:
+            clauses.append('folder_id = ?')
+            params.append(folder_id)
+        if content_type:
+            clauses.append('content_type = ?')
+            params.append(content_type)
+        if search:
+            # Kode yang cocok dari indeks dikirim sebagai satu parameter JSON
+            clauses.append('short_code in (select value from json_each(?))')
+            params.append(json.dumps(self.search_index.search(user_id, search, self._search_rows)))
+        return clauses, params
+
+    def count_links(self, user_id, folder_id=None, content_type=None, count='exact', search=None):
+        clauses, params = self._link_filters(user_id, folder_id, content_type, search)
+        return self._query(f"select count(*) as total from links where {' and '.join(clauses)}", params)[0]['total']
+
+    def list_links(self, user_id, folder_id=None, content_type=None, cursor=None, offset=0, limit=10, columns='*', count=None, search=None):
+        names = parse_columns(columns)
+        clauses, params = self._link_filters(user_id, folder_id, content_type, search)
+        total = self.count_links(user_id, folder_id, content_type, search=search) if count and not cursor else None
+        if cursor:
+            created_at, short_code = cursor
+            clauses.append('(created_at < ? or (created_at = ? and short_code < ?))')
+            params += [created_at, created_at, short_code]
+            offset = 0
+        rows = self._query(
+            f"select {', '.join(names)} from links where {' and '.join(clauses)} "
+            f"order by created_at desc, short_code desc limit ? offset ?",
+            [*params, limit, offset]
+        )
+        return rows, total
+
+    def lease_code_block(self, block_size):
+        with self._lock:
+            self.conn.execute('begin immediate')
+            try:
+                start = self.conn.execute('select next_id from code_counter where id = 1').fetchone()[0]
+                self.conn.execute('update code_counter set next_id = next_id + ? where id = 1', (block_size,))
+                self.conn.execute('commit')
+            except Exception:
+                self.conn.execute('rollback')
+                raise
+            return start
+
+    def record_clicks(self, rows):
+        with self._lock:
+            self.conn.execute('begin')
+            try:
+                for row in rows:
+                    if not self.conn.execute('select 1 from links where short_code = ?', (row['short_code'],)).fetchone():
+                        continue
+                    self.conn.execute(
+                        'insert into link_clicks (short_code, minute, referrer, ua_class, clicks) values (?, ?, ?, ?, ?) '
+                        'on conflict (short_code, minute, referrer, ua_class) do update set clicks = clicks + excluded.clicks',
+                        (row['short_code'], row['minute'], row['referrer'], row['ua_class'], row['clicks'])
+                    )
+                    self.conn.execute('update links set click_count = click_count + ? where short_code = ?', (row['clicks'], row['short_code']))
+                self.conn.execute('commit')
+            except Exception:
+                self.conn.execute('rollback')
+                raise
+
+    def click_series(self, short_code, since, bucket):
+        fmt = '%Y-%m-%dT%H:00:00+00:00' if bucket == 'hour' else '%Y-%m-%dT00:00:00+00:00'
+        return self._query(
+            'select strftime(?, minute) as bucket, sum(clicks) as clicks from link_clicks '
+            'where short_code = ? and minute >= ? group by 1 order by 1',
+            (fmt, short_code, since)
+        )
+
+    # Users
+    def email_exists(self, email, exclude_user_id=None):
+        if exclude_user_id:
+            return bool(self._query('select 1 from users where email = ? and id != ?', (email, exclude_user_id)))
+        return bool(self._query('select 1 from users where email = ?', (email,)))
+
+    def create_user(self, email, password):
+        cursor = self._execute('insert into users (email, password) values (?, ?)', (email, password))
+        return {'id': cursor.lastrowid, 'email': email}
+
+    def find_user(self, email, password):
+        rows = self._query('select * from users where email = ? and password = ?', (email, password))
+        return rows[0] if rows else None
+
+    def update_user(self, user_id, updates):
+        names = [name for name in updates if name in ('email', 'password')]
+        if names:
+            self._execute(
+                f"update users set {', '.join(f'{name} = ?' for name in names)} where id = ?",
+                [updates[name] for name in names] + [user_id]
+            )
+
+    # Folders
+    def list_folders(self, user_id):
+        return self._query('select * from folders where user_id = ? order by id', (user_id,))
+
+    def folder_name_exists(self, name, user_id):
+        return bool(self._query('select 1 from folders where name = ? and user_id = ?', (name, user_id)))
+
+    def create_folder(self, name, user_id):
+        self._execute('insert into folders (name, user_id) values (?, ?)', (name, user_id))
+
+    def owned_folder_ids(self, user_id, folder_ids):
+        if not folder_ids:
+            return set()
+        rows = self._query(
+            f"select id from folders where user_id = ? and id in ({self._placeholders(folder_ids)})",
+            [user_id, *folder_ids]
+        )
+        return {str(row['id']) for row in rows}
+
+    def delete_folders(self, user_id, folder_ids):
+        if not folder_ids:
+            return
+        self._execute(
+            f"delete from folders where user_id = ? and id in ({self._placeholders(folder_ids)})",
+            [user_id, *folder_ids]
+        )
+
+    # Objek file per hash isi
+    def acquire_content(self, content_hash):
+        with self._lock:
+            self.conn.execute('update content_objects set ref_count = ref_count + 1 where content_hash = ?', (content_hash,))
+            row = self.conn.execute('select path from content_objects where content_hash = ?', (content_hash,)).fetchone()
+            return row['path'] if row else None
+
+    def register_content(self, content_hash, path, size, mimetype):
+        with self._lock:
+            self.conn.execute(
+                'insert into content_objects (content_hash, path, size, mimetype, ref_count) values (?, ?, ?, ?, 1) '
+                'on conflict (content_hash) do update set ref_count = ref_count + 1',
+                (content_hash, path, size, mimetype)
+            )
+            return self.conn.execute('select path from content_objects where content_hash = ?', (content_hash,)).fetchone()['path']
+
+    def release_content(self, content_hashes):
+        if not content_hashes:
+            return []
+        with self._lock:
+            self.conn.execute('begin')
+            try:
+                for content_hash in content_hashes:
+                    self.conn.execute('update content_objects set ref_count = ref_count - 1 where content_hash = ?', (content_hash,))
+                placeholders = self._placeholders(set(content_hashes))
+                params = list(set(content_hashes))
+                paths = [row['path'] for row in self.conn.execute(
+                    f"select path from content_objects where ref_count <= 0 and content_hash in ({placeholders})", params
+                ).fetchall()]
+                self.conn.execute(f"delete from content_objects where ref_count <= 0 and content_hash in ({placeholders})", params)
+                self.conn.execute('commit')
+            except Exception:
+                self.conn.execute('rollback')
+                raise
+            return paths
+
+
+class MemoryRepository(SQLiteRepository):
+    # Database SQLite di memori: hilang saat proses berhenti, cocok untuk benchmark
+    def __init__(self, search_index_users=64):
+        super().__init__(':memory:', search_index_users)
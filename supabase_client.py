@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+
+
+class LazySupabaseClient:
+    # Pengganti `supabase.Client` yang baru meng-import SDK dan membuat client saat
+    # atribut pertama diakses, sehingga cold start tidak membayar import supabase/httpx.
+    # PostgREST dan Storage memakai satu connection pool keep-alive yang sama, dipakai
+    # ulang oleh semua request selama instance masih hangat.
+    def __init__(self, url, key, max_connections=20, max_keepalive=10, keepalive_expiry=60, timeout=None):
+        self.url = url
+        self.key = key
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.created_seconds = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    start = time.perf_counter()
+                    self._client = self._create()
+                    self.created_seconds = time.perf_counter() - start
+                    logging.info(f"Client Supabase dibuat dalam {self.created_seconds * 1000:.1f}ms")
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def _create(self):
+        import httpx
+        from supabase import create_client, ClientOptions
+
+        options = ClientOptions()
+        if self.timeout:
+            options.postgrest_client_timeout = self.timeout
+            options.storage_client_timeout = self.timeout
+        try:
+            client = create_client(self.url, self.key, options)
+        except Exception as e:
+            raise ValueError(f"Gagal menginisialisasi Supabase: {str(e)}")
+
+        transport = httpx.HTTPTransport(
+            http2=True,
+            retries=1,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry
+            )
+        )
+        client.postgrest.session = self._pooled_session(client.postgrest.session, transport)
+        storage = client.storage
+        storage.session = storage._client = self._pooled_session(storage.session, transport)
+        return client
+
+    @staticmethod
+    def _pooled_session(session, transport):
+        # Session baru dengan base_url/header/timeout yang sama, tetapi transport bersama
+        pooled = type(session)(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=session.timeout,
+            follow_redirects=True,
+            transport=transport
+        )
+        session.close()
+        return pooled
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATA_BACKEND', 'memory')
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+
+
+@pytest.fixture
+def linkit():
+    import app
+    app.link_cache.clear()
+    return app
+
+
+@pytest.fixture
+def client(linkit):
+    client = linkit.app.test_client()
+    client.post('/register', data={'email': f'user{id(client)}@example.com', 'password': 'rahasia'})
+    return client
@@ -0,0 +1,9 @@
+def test_api_links_ignores_non_numeric_limit(client):
+    client.post('/shorten', data={'content_type': 'url', 'url': 'example.com', 'custom_code': 'lim01'})
+    response = client.get('/api/links?limit=abc')
+    assert response.status_code == 200
+    assert [link['short_code'] for link in response.get_json()['links']] == ['lim01']
+
+
+def test_dashboard_ignores_non_numeric_page(client):
+    assert client.get('/dashboard?page=abc').status_code == 200
@@ -0,0 +1,5 @@
+def test_link_clicks_ignores_non_numeric_days(client):
+    client.post('/shorten', data={'content_type': 'url', 'url': 'example.com', 'custom_code': 'clk01'})
+    response = client.get('/api/links/clk01/clicks?days=abc')
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
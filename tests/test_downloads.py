@@ -0,0 +1,26 @@
+import io
+
+
+def upload_document(client, code, data):
+    form = {'content_type': 'document', 'custom_code': code, 'file': (io.BytesIO(data), 'report.pdf')}
+    return client.post('/shorten', data=form, content_type='multipart/form-data')
+
+
+def test_download_range(client):
+    data = bytes(range(256)) * 4
+    upload_document(client, 'rng01', data)
+    response = client.get('/download/rng01', headers={'Range': 'bytes=10-19'})
+    assert response.status_code == 206
+    assert response.data == data[10:20]
+    assert response.headers['Content-Range'] == f'bytes 10-19/{len(data)}'
+    response.close()
+
+
+def test_download_range_not_satisfiable(client):
+    data = b'%PDF-1.4 isi dokumen'
+    upload_document(client, 'rng02', data)
+    response = client.get('/download/rng02', headers={'Range': f'bytes={len(data) + 100}-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(data)}'
+    assert 'Location' not in response.headers
+    response.close()
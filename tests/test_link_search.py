@@ -0,0 +1,21 @@
+from link_search import UserIndex, normalize_query
+
+
+def test_normalize_query_strips_url_prefix():
+    assert normalize_query('  https://www.Example.com/docs ') == 'example.com/docs'
+    assert normalize_query('WWW.example') == 'example'
+    assert normalize_query('http://example.com') == 'example.com'
+
+
+def test_search_with_full_url_matches_indexed_link():
+    index = UserIndex([{'short_code': 'abc123', 'content_type': 'url', 'content': 'https://www.example.com/docs'}])
+    assert index.search(normalize_query('https://www.example.com/docs')) == ['abc123']
+    assert index.search(normalize_query('www.example')) == ['abc123']
+
+
+def test_api_links_search_with_full_url(client):
+    client.post('/shorten', data={'content_type': 'url', 'url': 'https://www.example.com/docs', 'custom_code': 'docs1'})
+    client.post('/shorten', data={'content_type': 'url', 'url': 'https://other.org/', 'custom_code': 'other1'})
+    response = client.get('/api/links', query_string={'q': 'https://www.example.com/docs'})
+    assert response.status_code == 200
+    assert [link['short_code'] for link in response.get_json()['links']] == ['docs1']
@@ -0,0 +1,57 @@
+import hashlib
+import zlib
+
+# zstandard opsional: tanpa zstandard teks besar dikompres dengan gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MIMETYPES = {'zst': 'application/zstd', 'gz': 'application/gzip'}
+
+
+def preferred_codec():
+    return 'zst' if zstandard is not None else 'gz'
+
+
+def content_key(data, codec):
+    # Codec ikut dalam hash agar objek yang sudah ada selalu bisa dibaca dengan codec yang cocok
+    return f"{codec}:{hashlib.sha256(data).hexdigest()}"
+
+
+def object_path(key):
+    # texts/<2 huruf>/<sha256>.txt.<codec>, di bucket yang sama dengan file upload
+    codec, digest = key.split(':', 1)
+    return f"texts/{digest[:2]}/{digest}.txt.{codec}"
+
+
+def codec_of(key):
+    return key.split(':', 1)[0]
+
+
+def compress(data, codec):
+    if codec == 'zst':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress_chunks(chunks, codec):
+    # Dekompresi per chunk dari storage; teks utuh tidak pernah ditahan di memori
+    if codec == 'zst':
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    else:
+        decompressor = zlib.decompressobj(31)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    if codec != 'zst':
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+def preview(text, limit):
+    # Potongan awal yang disimpan di baris link (dashboard, pencarian, ETag)
+    return text if len(text) <= limit else text[:limit].rstrip() + '…'
@@ -0,0 +1,73 @@
+import contextlib
+import hashlib
+import io
+import os
+import tempfile
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class SpooledUpload:
+    # Salin stream upload per chunk sambil menghitung sha256 dan ukuran. Isi ditahan di
+    # memori sampai `threshold` byte, setelah itu dipindah ke file sementara di disk.
+    def __init__(self, threshold=1024 * 1024, max_size=10 * 1024 * 1024, chunk_size=64 * 1024):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._buffer = io.BytesIO()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def spooled_to_disk(self):
+        return self._file is not None
+
+    @property
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def consume(self, stream):
+        while True:
+            chunk = stream.read(self.chunk_size)
+            if not chunk:
+                break
+            self.size += len(chunk)
+            if self.size > self.max_size:
+                raise UploadTooLarge(f"File melebihi {self.max_size} byte")
+            self._hash.update(chunk)
+            if self._file is None and self.size > self.threshold:
+                self._file = tempfile.NamedTemporaryFile(prefix='linkit-upload-', delete=False)
+                self._file.write(self._buffer.getvalue())
+                self._buffer = None
+            (self._file or self._buffer).write(chunk)
+        if self._file is not None:
+            self._file.flush()
+        return self
+
+    @contextlib.contextmanager
+    def payload(self):
+        # bytes bila masih di memori, file biner (BufferedReader) bila sudah di disk;
+        # keduanya diterima content store dan SDK storage tanpa membaca ulang ke memori
+        if self._file is None:
+            yield self._buffer.getvalue()
+            return
+        with open(self._file.name, 'rb') as f:
+            yield f
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.remove(self._file.name)
+            except FileNotFoundError:
+                pass
+            self._file = None